@@ -3,21 +3,43 @@
 Migration cleanup utility to handle orphaned or problematic migration records.
 """
 
-import sys
+import argparse
+import os
 from pathlib import Path
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 from src.booking.database import SessionLocal
 from src.booking.models.migration import SchemaMigration
 
+# Discovered migrations per directory, keyed by the directory's mtime
+_DISCOVERY_CACHE: dict[str, tuple[float, list]] = {}
+
+
+def discover_migrations_cached(manager) -> list:
+    """Discover migrations, reusing the previous scan while the directory is unchanged."""
+    migrations_dir = manager.migrations_dir
+    mtime = os.stat(migrations_dir).st_mtime
+    cached = _DISCOVERY_CACHE.get(migrations_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    migrations = manager.discover_migrations()
+    _DISCOVERY_CACHE[migrations_dir] = (mtime, migrations)
+    return migrations
+
 
 def get_migration_records() -> list:
     """Get all migration records from the database."""
-    session = SessionLocal()
-    try:
-        records = session.query(SchemaMigration).order_by(SchemaMigration.version).all()
-        return records
-    finally:
-        session.close()
+    with SessionLocal() as session:
+        # Plain rows are enough for listing; skip ORM instance construction
+        return session.execute(
+            select(
+                SchemaMigration.version,
+                SchemaMigration.status,
+                SchemaMigration.description,
+                SchemaMigration.error_message,
+            ).order_by(SchemaMigration.version)
+        ).all()
 
 
 def list_migration_records():
@@ -56,94 +78,97 @@ def list_migration_records():
 
 def remove_rolled_back_records():
     """Remove all rolled-back migration records from the database."""
-    session = SessionLocal()
-    try:
-        rolled_back = session.query(SchemaMigration).filter(
-            SchemaMigration.status == "rolled_back"
-        ).all()
+    with SessionLocal() as session:
+        try:
+            rolled_back = session.execute(
+                select(SchemaMigration.version, SchemaMigration.description)
+                .where(SchemaMigration.status == "rolled_back")
+                .order_by(SchemaMigration.version)
+            ).all()
         
-        if not rolled_back:
-            print("No rolled-back migration records found.")
-            return
+            if not rolled_back:
+                print("No rolled-back migration records found.")
+                return
         
-        print(f"Found {len(rolled_back)} rolled-back migration record(s):")
-        for record in rolled_back:
-            print(f"  - {record.version}: {record.description}")
-        
-        confirm = input("\nDo you want to remove these records? (y/N): ").strip().lower()
-        if confirm == 'y':
+            print(f"Found {len(rolled_back)} rolled-back migration record(s):")
             for record in rolled_back:
-                session.delete(record)
-            session.commit()
-            print(f"✅ Removed {len(rolled_back)} rolled-back migration record(s).")
-        else:
-            print("Operation cancelled.")
-    
-    except Exception as e:
-        session.rollback()
-        print(f"❌ Error removing records: {e}")
-    finally:
-        session.close()
+                print(f"  - {record.version}: {record.description}")
+        
+            confirm = input("\nDo you want to remove these records? (y/N): ").strip().lower()
+            if confirm == 'y':
+                result = session.execute(
+                    delete(SchemaMigration).where(SchemaMigration.status == "rolled_back")
+                )
+                session.commit()
+                print(f"✅ Removed {result.rowcount} rolled-back migration record(s).")
+            else:
+                print("Operation cancelled.")
+    
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error removing records: {e}")
 
 
 def remove_specific_record(version: str):
     """Remove a specific migration record by version."""
-    session = SessionLocal()
-    try:
-        record = session.query(SchemaMigration).filter(
-            SchemaMigration.version == version
-        ).first()
+    with SessionLocal() as session:
+        try:
+            record = session.query(SchemaMigration).filter(
+                SchemaMigration.version == version
+            ).first()
         
-        if not record:
-            print(f"Migration record {version} not found.")
-            return
+            if not record:
+                print(f"Migration record {version} not found.")
+                return
         
-        print(f"Found migration record:")
-        print(f"  Version: {record.version}")
-        print(f"  Status: {record.status}")
-        print(f"  Description: {record.description}")
-        print(f"  Applied at: {record.applied_at}")
+            print(f"Found migration record:")
+            print(f"  Version: {record.version}")
+            print(f"  Status: {record.status}")
+            print(f"  Description: {record.description}")
+            print(f"  Applied at: {record.applied_at}")
         
-        if record.error_message:
-            print(f"  Error: {record.error_message}")
+            if record.error_message:
+                print(f"  Error: {record.error_message}")
         
-        confirm = input(f"\nDo you want to remove migration record {version}? (y/N): ").strip().lower()
-        if confirm == 'y':
-            session.delete(record)
-            session.commit()
-            print(f"✅ Removed migration record {version}.")
-        else:
-            print("Operation cancelled.")
-    
-    except Exception as e:
-        session.rollback()
-        print(f"❌ Error removing record: {e}")
-    finally:
-        session.close()
+            confirm = input(f"\nDo you want to remove migration record {version}? (y/N): ").strip().lower()
+            if confirm == 'y':
+                session.delete(record)
+                session.commit()
+                print(f"✅ Removed migration record {version}.")
+            else:
+                print("Operation cancelled.")
+    
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error removing record: {e}")
 
 
 def check_missing_files():
     """Check for migration records that don't have corresponding files."""
     from src.booking.migrations.manager import MigrationManager
     
-    session = SessionLocal()
-    try:
+    with SessionLocal() as session:
         manager = MigrationManager(session, debug_mode=True)
         
-        # Get all records (including rolled back)
-        all_records = session.query(SchemaMigration).all()
+        # Get all recorded versions (including rolled back)
+        db_versions = set(session.scalars(select(SchemaMigration.version)))
         
         # Get discovered migrations
-        discovered_migrations = manager.discover_migrations()
+        discovered_migrations = discover_migrations_cached(manager)
         discovered_versions = {m.version for m in discovered_migrations}
         
         print("🔍 Checking for missing migration files:")
         print("=" * 50)
         
+        # Only load details for the records that are actually missing
+        missing_versions = db_versions - discovered_versions
         missing_files = []
-        for record in all_records:
-            if record.version not in discovered_versions:
-                missing_files.append(record)
+        if missing_versions:
+            missing_files = session.execute(
+                select(SchemaMigration.version, SchemaMigration.status, SchemaMigration.description)
+                .where(SchemaMigration.version.in_(missing_versions))
+                .order_by(SchemaMigration.version)
+            ).all()
         
         if not missing_files:
             print("✅ All migration records have corresponding files.")
@@ -159,50 +184,42 @@ def check_missing_files():
         
         print("=" * 50)
         return missing_files
-    
-    finally:
-        session.close()
 
 
 def main():
     """Main CLI interface."""
-    if len(sys.argv) < 2:
-        print("Migration Cleanup Utility")
-        print("=" * 30)
-        print("Usage:")
-        print("  python cleanup_migrations.py list                  - List all migration records")
-        print("  python cleanup_migrations.py check                 - Check for missing files")
-        print("  python cleanup_migrations.py clean-rolled-back     - Remove rolled-back records")
-        print("  python cleanup_migrations.py remove <version>      - Remove specific record")
-        print()
-        print("Examples:")
-        print("  python cleanup_migrations.py list")
-        print("  python cleanup_migrations.py remove 008")
-        print("  python cleanup_migrations.py clean-rolled-back")
+    parser = argparse.ArgumentParser(
+        description="Migration Cleanup Utility",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python cleanup_migrations.py list
+  python cleanup_migrations.py remove 008
+  python cleanup_migrations.py clean-rolled-back
+        """
+    )
+    
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.add_parser("list", help="List all migration records")
+    subparsers.add_parser("check", help="Check for missing files")
+    subparsers.add_parser("clean-rolled-back", help="Remove rolled-back records")
+    remove_parser = subparsers.add_parser("remove", help="Remove specific record")
+    remove_parser.add_argument("version", help="Migration version to remove, e.g. 008")
+    
+    args = parser.parse_args()
+    
+    commands = {
+        "list": lambda args: list_migration_records(),
+        "check": lambda args: check_missing_files(),
+        "clean-rolled-back": lambda args: remove_rolled_back_records(),
+        "remove": lambda args: remove_specific_record(args.version),
+    }
+    
+    if args.command is None:
+        parser.print_help()
         return
     
-    command = sys.argv[1]
-    
-    if command == "list":
-        list_migration_records()
-    
-    elif command == "check":
-        check_missing_files()
-    
-    elif command == "clean-rolled-back":
-        remove_rolled_back_records()
-    
-    elif command == "remove":
-        if len(sys.argv) < 3:
-            print("❌ Version required for remove command")
-            print("Usage: python cleanup_migrations.py remove <version>")
-            return
-        version = sys.argv[2]
-        remove_specific_record(version)
-    
-    else:
-        print(f"❌ Unknown command: {command}")
-        print("Run without arguments to see usage.")
+    commands[args.command](args)
 
 
 if __name__ == "__main__":
@@ -127,19 +127,19 @@ Exit Codes:
                 sys.exit(1)
         
         elif args.command == "check":
-            ready = runner.check_database_ready()
+            ready, status, (is_compatible, message, _) = runner.describe_state()
             
             if ready:
                 print("✅ Database is ready - all migrations applied, no errors detected")
                 sys.exit(0)
             else:
-                status = runner.get_status()
-                
                 print("❌ Database is not ready:")
                 if status['has_pending']:
                     print(f"   - {status['pending_count']} pending migration(s)")
                 if status['has_errors']:
                     print(f"   - {len(status['validation_errors'])} validation error(s)")
+                if not is_compatible:
+                    print(f"   - {message}")
                 
                 if args.verbose:
                     print("\nDetailed status:")
@@ -160,19 +160,11 @@ Exit Codes:
             print(f"Description: {schema_info['description']}")
             
             print("\n📊 Current Database Status:")
-            status = runner.get_status()
+            status = runner.describe_state().status
             if status['applied_count'] > 0:
-                # Get highest applied version
-                from booking.migrations.manager import MigrationManager
-                from booking.database import SessionLocal
-                session = SessionLocal()
-                try:
-                    manager = MigrationManager(session)
-                    applied = manager.get_applied_migrations()
-                    current_version = max(applied.keys(), key=lambda x: int(x)) if applied else "none"
-                    print(f"Current version: {current_version}")
-                finally:
-                    session.close()
+                # Highest applied version, from the status already loaded above
+                current_version = max(status['applied_versions'], key=int)
+                print(f"Current version: {current_version}")
             else:
                 print("Current version: none (no migrations applied)")
         
@@ -0,0 +1,15 @@
+"""
+Make the application importable from the standalone scripts in this directory.
+
+Importing this module puts the project root (for ``src.booking``) and ``src``
+(for ``booking``) on sys.path, so a script works however it is started.
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+for path in (str(PROJECT_ROOT / "src"), str(PROJECT_ROOT)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,106 @@
+"""
+Shared helpers for the standalone migration scripts in this directory.
+
+The scripts are run directly (python migration/<script>.py), so this module is
+imported as ``_common`` from the script's own directory.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = "booking.db"
+
+# Journaling and cache settings for the bulk DDL/DML of a migration: WAL with
+# synchronous=NORMAL avoids a full fsync per commit, the rest keeps the
+# working set in memory
+SQLITE_TUNING_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+"""
+
+def tune(conn):
+    """Apply the tuning PRAGMAs to a freshly opened sqlite3 connection"""
+    conn.executescript(SQLITE_TUNING_PRAGMAS)
+
+def _tune_dbapi_connection(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        tune(dbapi_connection)
+
+def tune_engine_connections():
+    """Apply the tuning PRAGMAs to every new SQLite connection of any SQLAlchemy engine"""
+    # Imported here so the plain sqlite3 scripts do not load SQLAlchemy
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not event.contains(Engine, "connect", _tune_dbapi_connection):
+        event.listen(Engine, "connect", _tune_dbapi_connection)
+
+def optimize(conn):
+    """Refresh planner statistics and truncate the WAL once a migration is done"""
+    conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+def optimize_engine_connection(conn):
+    """optimize() for a SQLAlchemy connection; a no-op on other databases"""
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA optimize")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+def connect(path=DEFAULT_DB_PATH):
+    """Open a tuned connection in autocommit mode; transactions are begun explicitly"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    tune(conn)
+    return conn
+
+def _write_marker(conn):
+    """Row changes and schema version, which both move when a transaction writes"""
+    return conn.total_changes, conn.execute("PRAGMA schema_version").fetchone()[0]
+
+@contextmanager
+def immediate_transaction(conn):
+    """Run the block in one BEGIN IMMEDIATE transaction, optimizing after the commit if it wrote"""
+    conn.execute("BEGIN IMMEDIATE")
+    before = _write_marker(conn)
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    wrote = _write_marker(conn) != before
+    conn.execute("COMMIT")
+    if wrote:
+        optimize(conn)
+
+@contextmanager
+def open_migration_db(path=DEFAULT_DB_PATH):
+    """Open the database and run the block in one write transaction, closing it afterwards"""
+    conn = connect(path)
+    try:
+        with immediate_transaction(conn):
+            yield conn
+    finally:
+        conn.close()
+
+def add_column_if_missing(conn, table, column, decl):
+    """Add a column unless it already exists; return True if it was added"""
+    try:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    except sqlite3.OperationalError as e:
+        if 'duplicate column' not in str(e).lower():
+            raise
+        return False
+    return True
+
+def seed_rows(conn, table, columns, rows, constants=None):
+    """INSERT OR IGNORE rows with one executemany, letting unique constraints skip duplicates.
+
+    constants maps further columns to SQL expressions used for every row.
+    """
+    constants = constants or {}
+    names = ", ".join([*columns, *constants])
+    values = ", ".join(["?"] * len(columns) + list(constants.values()))
+    conn.executemany(f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({values})", rows)
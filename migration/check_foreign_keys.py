@@ -1,46 +1,47 @@
 """
 Check foreign key constraints in the bookings table
 """
-import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine
 from src.booking.database import SQLALCHEMY_DATABASE_URL
 
+_engine = None
+
+def get_engine():
+    """Create the engine on first use and reuse it for later checks"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    return _engine
+
 def check_foreign_keys():
     """Check foreign key constraints"""
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    
     try:
-        print("🔍 Checking foreign key constraints...")
-        
-        # Check foreign keys for bookings table
-        result = session.execute(text("PRAGMA foreign_key_list(bookings)"))
-        foreign_keys = result.fetchall()
-        
-        print("\n📋 Foreign keys in bookings table:")
-        for fk in foreign_keys:
-            print(f"  {fk}")
-        
-        # Check if foreign keys are enabled
-        result = session.execute(text("PRAGMA foreign_keys"))
-        fk_enabled = result.fetchone()[0]
-        print(f"\n🔧 Foreign keys enabled: {bool(fk_enabled)}")
-        
-        # Check table schema
-        result = session.execute(text("SELECT sql FROM sqlite_master WHERE type='table' AND name='bookings'"))
-        schema = result.fetchone()
-        if schema:
-            print(f"\n📄 Table creation SQL:\n{schema[0]}")
+        # The PRAGMAs are read-only, so a plain connection is enough
+        with get_engine().connect() as conn:
+            print("🔍 Checking foreign key constraints...")
+            
+            # Check foreign keys for bookings table
+            foreign_keys = conn.exec_driver_sql("PRAGMA foreign_key_list(bookings)")
+            
+            print("\n📋 Foreign keys in bookings table:")
+            for fk in foreign_keys:
+                print(f"  {fk}")
+            
+            # Check if foreign keys are enabled
+            fk_enabled = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+            print(f"\n🔧 Foreign keys enabled: {bool(fk_enabled)}")
+            
+            # Check table schema
+            schema = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type='table' AND name='bookings'"
+            ).first()
+            if schema:
+                print(f"\n📄 Table creation SQL:\n{schema[0]}")
         
     except Exception as e:
         print(f"❌ Error checking foreign keys: {e}")
-    finally:
-        session.close()
 
 if __name__ == "__main__":
     check_foreign_keys()
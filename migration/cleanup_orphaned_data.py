@@ -7,12 +7,32 @@ import sqlite3
 import os
 from datetime import datetime
 
+# Spaces without a lot, evaluated as an anti-join against parking_lots
+ORPHANED_SPACE_CONDITION = """
+    ps.lot_id IS NULL
+    OR NOT EXISTS (SELECT 1 FROM parking_lots pl WHERE pl.id = ps.lot_id)
+"""
+
+# Rows removed per DELETE statement; each batch is committed on its own so
+# the database is never locked by one long-running statement
+BATCH_SIZE = 1000
+
 def get_db_path():
     """Get the database path"""
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(current_dir)
     return os.path.join(project_root, 'booking.db')
 
+def delete_in_batches(conn, delete_sql):
+    """Run a DELETE taking a LIMIT parameter until it removes no more rows"""
+    total_deleted = 0
+    while True:
+        cursor = conn.execute(delete_sql, (BATCH_SIZE,))
+        conn.commit()
+        if cursor.rowcount <= 0:
+            return total_deleted
+        total_deleted += cursor.rowcount
+
 def cleanup_orphaned_data():
     """Clean up orphaned parking spaces and bookings"""
     db_path = get_db_path()
@@ -30,70 +50,49 @@ def cleanup_orphaned_data():
         # Enable foreign key constraints
         cursor.execute("PRAGMA foreign_keys = ON;")
         
-        # Begin transaction
-        cursor.execute("BEGIN TRANSACTION;")
-        
-        # Step 1: Find orphaned spaces
-        cursor.execute('''
-            SELECT ps.id, ps.lot_id 
-            FROM parking_spaces ps 
-            LEFT JOIN parking_lots pl ON ps.lot_id = pl.id 
-            WHERE pl.id IS NULL OR ps.lot_id IS NULL;
+        # Step 1: Delete bookings referencing orphaned spaces
+        orphaned_booking_count = delete_in_batches(conn, f'''
+            DELETE FROM bookings 
+            WHERE rowid IN (
+                SELECT b.rowid FROM bookings b 
+                JOIN parking_spaces ps ON b.space_id = ps.id 
+                WHERE {ORPHANED_SPACE_CONDITION} 
+                LIMIT ?
+            );
         ''')
-        orphaned_spaces = cursor.fetchall()
-        
-        if orphaned_spaces:
-            print(f"📋 Found {len(orphaned_spaces)} orphaned parking spaces")
-            space_ids = [str(space[0]) for space in orphaned_spaces]
-            
-            # Step 2: Find bookings referencing orphaned spaces
-            if space_ids:
-                cursor.execute(f'''
-                    SELECT COUNT(*) FROM bookings 
-                    WHERE space_id IN ({','.join(space_ids)});
-                ''')
-                orphaned_booking_count = cursor.fetchone()[0]
-                
-                if orphaned_booking_count > 0:
-                    print(f"📋 Found {orphaned_booking_count} bookings referencing orphaned spaces")
-                    
-                    # Delete bookings referencing orphaned spaces
-                    cursor.execute(f'''
-                        DELETE FROM bookings 
-                        WHERE space_id IN ({','.join(space_ids)});
-                    ''')
-                    print(f"🗑️  Deleted {orphaned_booking_count} orphaned bookings")
-                
-                # Step 3: Delete orphaned spaces
-                cursor.execute(f'''
-                    DELETE FROM parking_spaces 
-                    WHERE id IN ({','.join(space_ids)});
-                ''')
-                print(f"🗑️  Deleted {len(orphaned_spaces)} orphaned parking spaces")
+        if orphaned_booking_count > 0:
+            print(f"🗑️  Deleted {orphaned_booking_count} orphaned bookings")
+        
+        # Step 2: Delete orphaned spaces
+        orphaned_space_count = delete_in_batches(conn, f'''
+            DELETE FROM parking_spaces 
+            WHERE rowid IN (
+                SELECT ps.rowid FROM parking_spaces ps 
+                WHERE {ORPHANED_SPACE_CONDITION} 
+                LIMIT ?
+            );
+        ''')
+        if orphaned_space_count > 0:
+            print(f"🗑️  Deleted {orphaned_space_count} orphaned parking spaces")
         else:
             print("✅ No orphaned parking spaces found")
         
-        # Step 4: Verify data integrity after cleanup
+        # Step 3: Verify data integrity after cleanup
         cursor.execute("PRAGMA foreign_key_check;")
         violations = cursor.fetchall()
         
         if violations:
             print(f"⚠️  Foreign key violations still exist: {violations}")
-            cursor.execute("ROLLBACK;")
             return False
         
-        # Commit transaction
-        cursor.execute("COMMIT;")
-        
         # Get final counts
-        cursor.execute("SELECT COUNT(*) FROM parking_lots;")
-        lot_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM parking_spaces;")
-        space_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bookings;")
-        booking_count = cursor.fetchone()[0]
+        cursor.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM parking_lots),
+                (SELECT COUNT(*) FROM parking_spaces),
+                (SELECT COUNT(*) FROM bookings);
+        ''')
+        lot_count, space_count, booking_count = cursor.fetchone()
         
         print(f"✅ Cleanup completed successfully!")
         print(f"📊 Final database contents:")
@@ -101,12 +100,9 @@ def cleanup_orphaned_data():
         print(f"   - Parking spaces: {space_count}")
         print(f"   - Bookings: {booking_count}")
         
-        # Final verification - check for any remaining orphaned data
-        cursor.execute('''
-            SELECT COUNT(*) FROM parking_spaces ps 
-            LEFT JOIN parking_lots pl ON ps.lot_id = pl.id 
-            WHERE pl.id IS NULL OR ps.lot_id IS NULL;
-        ''')
+        # Final verification - dangling lot references were already ruled out by
+        # the foreign key check above, only spaces without any lot remain to count
+        cursor.execute("SELECT COUNT(*) FROM parking_spaces WHERE lot_id IS NULL;")
         remaining_orphaned = cursor.fetchone()[0]
         
         if remaining_orphaned > 0:
@@ -3,19 +3,15 @@
 Database migration script to add BackupSettings table
 """
 import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, inspect
-from src.booking.database import SQLALCHEMY_DATABASE_URL, Base
+from sqlalchemy import inspect
+from src.booking.database import Base, engine
 from src.booking.models import BackupSettings
 
 def migrate_backup_settings():
     """Add BackupSettings table to the database"""
     
-    # Create engine
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-    
     # Check if table already exists
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
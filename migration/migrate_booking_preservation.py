@@ -9,19 +9,75 @@ import os
 import sys
 from datetime import datetime
 
+# Step 1: create the new bookings table with nullable space_id and
+# deleted_space_info, step 2: copy the data, step 3: swap the tables,
+# step 4: index the foreign key columns (the id primary key needs no index)
+BOOKING_PRESERVATION_MIGRATION_SQL = """
+BEGIN IMMEDIATE;
+
+CREATE TABLE bookings_new (
+    id INTEGER PRIMARY KEY,
+    space_id INTEGER REFERENCES parking_spaces(id) ON DELETE SET NULL,
+    user_id INTEGER REFERENCES users(id),
+    start_time DATETIME,
+    end_time DATETIME,
+    license_plate VARCHAR,
+    is_cancelled BOOLEAN DEFAULT 0,
+    deleted_space_info VARCHAR
+);
+
+INSERT INTO bookings_new (id, space_id, user_id, start_time, end_time, license_plate, is_cancelled)
+SELECT id, space_id, user_id, start_time, end_time, license_plate, is_cancelled
+FROM bookings;
+
+DROP TABLE bookings;
+ALTER TABLE bookings_new RENAME TO bookings;
+
+CREATE INDEX ix_bookings_space_id ON bookings (space_id);
+CREATE INDEX IF NOT EXISTS ix_parking_spaces_lot_id ON parking_spaces (lot_id);
+
+COMMIT;
+"""
+
+# Journaling/sync settings used while the tables are rebuilt. Durability is
+# not needed during the copy: the file backup is restored if anything fails.
+FAST_REBUILD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-200000",
+}
+
+def set_pragmas(cursor, pragmas):
+    """Apply PRAGMA values and return the previous ones so they can be restored"""
+    previous = {}
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name};")
+        previous[name] = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA {name} = {value};")
+    return previous
+
 def get_db_path():
     """Get the database path"""
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(current_dir)
     return os.path.join(project_root, 'booking.db')
 
+def copy_database(source_path, target_path):
+    """Copy a database page by page with SQLite's online backup API"""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=1024)
+    finally:
+        target.close()
+        source.close()
+
 def backup_database(db_path):
     """Create a backup of the database"""
     backup_path = f"{db_path}.backup_preservation_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
-    # Copy the database file
-    import shutil
-    shutil.copy2(db_path, backup_path)
+    copy_database(db_path, backup_path)
     print(f"✅ Database backed up to: {backup_path}")
     return backup_path
 
@@ -37,7 +93,9 @@ def migrate_booking_preservation():
     backup_path = backup_database(db_path)
     
     try:
-        conn = sqlite3.connect(db_path)
+        # Autocommit mode: the script's BEGIN IMMEDIATE is the only transaction
+        # and takes the write lock before any table is touched
+        conn = sqlite3.connect(db_path, isolation_level=None)
         cursor = conn.cursor()
         
         print("🔧 Starting booking preservation migration...")
@@ -50,48 +108,16 @@ def migrate_booking_preservation():
         # Temporarily disable foreign key constraints for the migration
         cursor.execute("PRAGMA foreign_keys = OFF;")
         
-        # Begin transaction
-        cursor.execute("BEGIN TRANSACTION;")
-        
-        # Step 1: Create new bookings table with nullable space_id and deleted_space_info
-        print("📝 Creating new bookings table with booking preservation...")
-        
-        cursor.execute("""
-            CREATE TABLE bookings_new (
-                id INTEGER PRIMARY KEY,
-                space_id INTEGER REFERENCES parking_spaces(id) ON DELETE SET NULL,
-                user_id INTEGER REFERENCES users(id),
-                start_time DATETIME,
-                end_time DATETIME,
-                license_plate VARCHAR,
-                is_cancelled BOOLEAN DEFAULT 0,
-                deleted_space_info VARCHAR
-            );
-        """)
-        
-        # Step 2: Copy data from old table to new table
-        print("📋 Copying data to new bookings table...")
-        
-        cursor.execute("""
-            INSERT INTO bookings_new (id, space_id, user_id, start_time, end_time, license_plate, is_cancelled)
-            SELECT id, space_id, user_id, start_time, end_time, license_plate, is_cancelled
-            FROM bookings;
-        """)
-        
-        # Step 3: Drop old table and rename new table
-        print("🔄 Replacing old bookings table with new one...")
-        
-        cursor.execute("DROP TABLE bookings;")
-        cursor.execute("ALTER TABLE bookings_new RENAME TO bookings;")
-        
-        # Step 4: Recreate indexes
-        print("📊 Recreating indexes...")
-        
-        # Recreate indexes for bookings
-        cursor.execute("CREATE INDEX ix_bookings_id ON bookings (id);")
-        
-        # Commit transaction
-        cursor.execute("COMMIT;")
+        # Rebuild the table in a single script so SQLite parses the batch once
+        print("📝 Rebuilding bookings table with booking preservation...")
+        previous_pragmas = set_pragmas(cursor, FAST_REBUILD_PRAGMAS)
+        try:
+            cursor.executescript(BOOKING_PRESERVATION_MIGRATION_SQL)
+        finally:
+            # A failed script leaves its transaction open, which would block the reset
+            if conn.in_transaction:
+                conn.rollback()
+            set_pragmas(cursor, previous_pragmas)
         
         # Re-enable foreign key constraints
         cursor.execute("PRAGMA foreign_keys = ON;")
@@ -105,18 +131,14 @@ def migrate_booking_preservation():
             return False
         
         # Get counts to verify migration
-        cursor.execute("SELECT COUNT(*) FROM parking_lots;")
-        lot_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM parking_spaces;")
-        space_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bookings;")
-        booking_count = cursor.fetchone()[0]
-        
-        # Check how many bookings have deleted_space_info
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE deleted_space_info IS NOT NULL;")
-        preserved_booking_count = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM parking_lots),
+                (SELECT COUNT(*) FROM parking_spaces),
+                (SELECT COUNT(*) FROM bookings),
+                (SELECT COUNT(*) FROM bookings WHERE deleted_space_info IS NOT NULL);
+        """)
+        lot_count, space_count, booking_count, preserved_booking_count = cursor.fetchone()
         
         print(f"✅ Migration completed successfully!")
         print(f"📊 Database contents:")
@@ -133,8 +155,7 @@ def migrate_booking_preservation():
         
         # Restore from backup
         print("🔄 Restoring from backup...")
-        import shutil
-        shutil.copy2(backup_path, db_path)
+        copy_database(backup_path, db_path)
         print("✅ Database restored from backup")
         
         return False
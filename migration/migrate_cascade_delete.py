@@ -8,19 +8,109 @@ import os
 import sys
 from datetime import datetime
 
+# Step 1: create new tables with CASCADE DELETE, step 2: copy the data,
+# step 3: swap the tables, step 4: index the foreign key columns so cascades
+# look up children instead of scanning (the id primary keys need no index)
+CASCADE_DELETE_MIGRATION_SQL = """
+BEGIN IMMEDIATE;
+
+CREATE TABLE parking_spaces_new (
+    id INTEGER PRIMARY KEY,
+    lot_id INTEGER REFERENCES parking_lots(id) ON DELETE CASCADE,
+    space_number VARCHAR,
+    position_x INTEGER,
+    position_y INTEGER,
+    width INTEGER,
+    height INTEGER,
+    color VARCHAR
+);
+
+CREATE TABLE bookings_new (
+    id INTEGER PRIMARY KEY,
+    space_id INTEGER REFERENCES parking_spaces(id) ON DELETE CASCADE,
+    user_id INTEGER REFERENCES users(id),
+    start_time DATETIME,
+    end_time DATETIME,
+    license_plate VARCHAR,
+    is_cancelled BOOLEAN DEFAULT 0
+);
+
+{parking_spaces_copy}
+
+{bookings_copy}
+
+DROP TABLE bookings;
+DROP TABLE parking_spaces;
+
+ALTER TABLE parking_spaces_new RENAME TO parking_spaces;
+ALTER TABLE bookings_new RENAME TO bookings;
+
+CREATE INDEX ix_parking_spaces_lot_id ON parking_spaces (lot_id);
+CREATE INDEX ix_bookings_space_id ON bookings (space_id);
+
+COMMIT;
+"""
+
+# Columns of the rebuilt tables, in the order they are declared above
+PARKING_SPACES_COLUMNS = (
+    "id", "lot_id", "space_number", "position_x", "position_y", "width", "height", "color",
+)
+BOOKINGS_COLUMNS = (
+    "id", "space_id", "user_id", "start_time", "end_time", "license_plate", "is_cancelled",
+)
+
+# Journaling/sync settings used while the tables are rebuilt. Durability is
+# not needed during the copy: the file backup is restored if anything fails.
+FAST_REBUILD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-200000",
+}
+
+def set_pragmas(cursor, pragmas):
+    """Apply PRAGMA values and return the previous ones so they can be restored"""
+    previous = {}
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name};")
+        previous[name] = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA {name} = {value};")
+    return previous
+
+def copy_table_sql(cursor, table, columns):
+    """
+    Build the INSERT that copies table into its rebuilt table_new. When the
+    live table has exactly the new columns in the same order, a bare SELECT *
+    lets SQLite use its transfer optimization and copy records without
+    decoding them; otherwise the columns are listed explicitly.
+    """
+    cursor.execute(f"PRAGMA table_info({table});")
+    if tuple(row[1] for row in cursor.fetchall()) == columns:
+        return f"INSERT INTO {table}_new SELECT * FROM {table};"
+    column_list = ", ".join(columns)
+    return f"INSERT INTO {table}_new ({column_list})\nSELECT {column_list}\nFROM {table};"
+
 def get_db_path():
     """Get the database path"""
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(current_dir)
     return os.path.join(project_root, 'booking.db')
 
+def copy_database(source_path, target_path):
+    """Copy a database page by page with SQLite's online backup API"""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=1024)
+    finally:
+        target.close()
+        source.close()
+
 def backup_database(db_path):
     """Create a backup of the database"""
     backup_path = f"{db_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
-    # Copy the database file
-    import shutil
-    shutil.copy2(db_path, backup_path)
+    copy_database(db_path, backup_path)
     print(f"✅ Database backed up to: {backup_path}")
     return backup_path
 
@@ -36,7 +126,9 @@ def migrate_cascade_delete():
     backup_path = backup_database(db_path)
     
     try:
-        conn = sqlite3.connect(db_path)
+        # Autocommit mode: the script's BEGIN IMMEDIATE is the only transaction
+        # and takes the write lock before any table is touched
+        conn = sqlite3.connect(db_path, isolation_level=None)
         cursor = conn.cursor()
         
         print("🔧 Starting cascade delete migration...")
@@ -49,76 +141,19 @@ def migrate_cascade_delete():
         # Temporarily disable foreign key constraints for the migration
         cursor.execute("PRAGMA foreign_keys = OFF;")
         
-        # Begin transaction
-        cursor.execute("BEGIN TRANSACTION;")
-        
-        # Step 1: Create new tables with CASCADE DELETE
-        print("📝 Creating new tables with CASCADE DELETE...")
-        
-        # Create new parking_spaces table with cascade delete
-        cursor.execute("""
-            CREATE TABLE parking_spaces_new (
-                id INTEGER PRIMARY KEY,
-                lot_id INTEGER REFERENCES parking_lots(id) ON DELETE CASCADE,
-                space_number VARCHAR,
-                position_x INTEGER,
-                position_y INTEGER,
-                width INTEGER,
-                height INTEGER,
-                color VARCHAR
-            );
-        """)
-        
-        # Create new bookings table with cascade delete
-        cursor.execute("""
-            CREATE TABLE bookings_new (
-                id INTEGER PRIMARY KEY,
-                space_id INTEGER REFERENCES parking_spaces(id) ON DELETE CASCADE,
-                user_id INTEGER REFERENCES users(id),
-                start_time DATETIME,
-                end_time DATETIME,
-                license_plate VARCHAR,
-                is_cancelled BOOLEAN DEFAULT 0
-            );
-        """)
-        
-        # Step 2: Copy data from old tables to new tables
-        print("📋 Copying data to new tables...")
-        
-        # Copy parking spaces data
-        cursor.execute("""
-            INSERT INTO parking_spaces_new (id, lot_id, space_number, position_x, position_y, width, height, color)
-            SELECT id, lot_id, space_number, position_x, position_y, width, height, color
-            FROM parking_spaces;
-        """)
-        
-        # Copy bookings data
-        cursor.execute("""
-            INSERT INTO bookings_new (id, space_id, user_id, start_time, end_time, license_plate, is_cancelled)
-            SELECT id, space_id, user_id, start_time, end_time, license_plate, is_cancelled
-            FROM bookings;
-        """)
-        
-        # Step 3: Drop old tables and rename new tables
-        print("🔄 Replacing old tables with new ones...")
-        
-        cursor.execute("DROP TABLE bookings;")
-        cursor.execute("DROP TABLE parking_spaces;")
-        
-        cursor.execute("ALTER TABLE parking_spaces_new RENAME TO parking_spaces;")
-        cursor.execute("ALTER TABLE bookings_new RENAME TO bookings;")
-        
-        # Step 4: Recreate indexes
-        print("📊 Recreating indexes...")
-        
-        # Recreate indexes for parking_spaces
-        cursor.execute("CREATE INDEX ix_parking_spaces_id ON parking_spaces (id);")
-        
-        # Recreate indexes for bookings
-        cursor.execute("CREATE INDEX ix_bookings_id ON bookings (id);")
-        
-        # Commit transaction
-        cursor.execute("COMMIT;")
+        # Rebuild both tables in a single script so SQLite parses the batch once
+        print("📝 Rebuilding parking_spaces and bookings with CASCADE DELETE...")
+        previous_pragmas = set_pragmas(cursor, FAST_REBUILD_PRAGMAS)
+        try:
+            cursor.executescript(CASCADE_DELETE_MIGRATION_SQL.format(
+                parking_spaces_copy=copy_table_sql(cursor, "parking_spaces", PARKING_SPACES_COLUMNS),
+                bookings_copy=copy_table_sql(cursor, "bookings", BOOKINGS_COLUMNS),
+            ))
+        finally:
+            # A failed script leaves its transaction open, which would block the reset
+            if conn.in_transaction:
+                conn.rollback()
+            set_pragmas(cursor, previous_pragmas)
         
         # Re-enable foreign key constraints
         cursor.execute("PRAGMA foreign_keys = ON;")
@@ -132,14 +167,13 @@ def migrate_cascade_delete():
             return False
         
         # Get counts to verify migration
-        cursor.execute("SELECT COUNT(*) FROM parking_lots;")
-        lot_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM parking_spaces;")
-        space_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bookings;")
-        booking_count = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM parking_lots),
+                (SELECT COUNT(*) FROM parking_spaces),
+                (SELECT COUNT(*) FROM bookings);
+        """)
+        lot_count, space_count, booking_count = cursor.fetchone()
         
         print(f"✅ Migration completed successfully!")
         print(f"📊 Database contents:")
@@ -155,8 +189,7 @@ def migrate_cascade_delete():
         
         # Restore from backup
         print("🔄 Restoring from backup...")
-        import shutil
-        shutil.copy2(backup_path, db_path)
+        copy_database(backup_path, db_path)
         print("✅ Database restored from backup")
         
         return False
@@ -49,9 +49,8 @@ def migrate_dynamic_reports_scheduling():
             print("Created email_settings table with dynamic reports fields")
         else:
             # Check which columns already exist
-            cursor.execute("PRAGMA table_info(email_settings)")
-            existing_columns = [row[1] for row in cursor.fetchall()]
-            print(f"Existing columns: {existing_columns}")
+            existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(email_settings)")}
+            print(f"Existing columns: {sorted(existing_columns)}")
             
             # Add missing columns
             new_columns = [
@@ -63,12 +62,18 @@ def migrate_dynamic_reports_scheduling():
                 ('last_dynamic_report_sent', 'TIMESTAMP')
             ]
             
-            for column_name, column_def in new_columns:
-                if column_name not in existing_columns:
-                    print(f"Adding column: {column_name}")
-                    cursor.execute(f"ALTER TABLE email_settings ADD COLUMN {column_name} {column_def}")
-                else:
-                    print(f"Column {column_name} already exists, skipping")
+            missing_columns = [(name, definition) for name, definition in new_columns
+                               if name not in existing_columns]
+            
+            if missing_columns:
+                print(f"Adding columns: {[name for name, _ in missing_columns]}")
+                # DDL can't be parameterized; send all ALTERs in one batch instead
+                cursor.executescript(";\n".join(
+                    f"ALTER TABLE email_settings ADD COLUMN {name} {definition}"
+                    for name, definition in missing_columns
+                ))
+            else:
+                print("All dynamic reports columns already exist, skipping")
         
         # Commit the changes
         conn.commit()
@@ -76,9 +81,8 @@ def migrate_dynamic_reports_scheduling():
         
         # Verify the table structure
         cursor.execute("PRAGMA table_info(email_settings)")
-        columns = cursor.fetchall()
         print("\nFinal table structure:")
-        for column in columns:
+        for column in cursor:
             print(f"  {column[1]} ({column[2]})")
         
     except sqlite3.Error as e:
@@ -101,7 +105,7 @@ def verify_migration():
         
         # Check that all required columns exist
         cursor.execute("PRAGMA table_info(email_settings)")
-        columns = {row[1]: row[2] for row in cursor.fetchall()}
+        columns = {row[1]: row[2] for row in cursor}
         
         required_columns = [
             'dynamic_reports_enabled',
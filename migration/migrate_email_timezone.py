@@ -5,13 +5,14 @@ Migration script to add timezone column to EmailSettings table.
 This fixes the error: 'EmailSettings' object has no attribute 'timezone'
 """
 
-import sys
 import os
 import sqlite3
 from datetime import datetime
 
-# Add the src directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from _common import add_column_if_missing, open_migration_db
+
+class VerificationError(Exception):
+    """The migrated schema did not turn out as expected"""
 
 def migrate_email_timezone():
     """Add timezone column to email_settings table"""
@@ -23,53 +24,29 @@ def migrate_email_timezone():
         return True
     
     try:
-        # Connect to database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check if timezone column already exists
-        cursor.execute("PRAGMA table_info(email_settings)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'timezone' in columns:
-            print("timezone column already exists in email_settings table. No migration needed.")
-            conn.close()
-            return True
-        
         print("Adding timezone column to email_settings table...")
         
-        # Add timezone column with default value UTC
-        cursor.execute("""
-            ALTER TABLE email_settings 
-            ADD COLUMN timezone TEXT DEFAULT 'UTC'
-        """)
-        
-        # Update any existing rows to have the default timezone
-        cursor.execute("""
-            UPDATE email_settings 
-            SET timezone = 'UTC' 
-            WHERE timezone IS NULL
-        """)
+        # ADD COLUMN with a constant DEFAULT backfills existing rows without rewriting them
+        with open_migration_db(db_path) as conn:
+            if not add_column_if_missing(conn, "email_settings", "timezone", "TEXT DEFAULT 'UTC'"):
+                print("timezone column already exists in email_settings table. No migration needed.")
+                return True
+            
+            print("✓ Successfully added timezone column to email_settings table")
+            
+            # Verify the migration, looking up just the one column; raising
+            # here rolls the transaction back instead of committing it
+            if not conn.execute(
+                "SELECT 1 FROM pragma_table_info('email_settings') WHERE name = 'timezone'"
+            ).fetchone():
+                raise VerificationError("timezone column not found")
         
-        # Commit changes
-        conn.commit()
-        
-        print("✓ Successfully added timezone column to email_settings table")
-        
-        # Verify the migration
-        cursor.execute("PRAGMA table_info(email_settings)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'timezone' in columns:
-            print("✓ Migration verified: timezone column exists")
-        else:
-            print("✗ Migration verification failed: timezone column not found")
-            conn.close()
-            return False
-        
-        conn.close()
+        print("✓ Migration verified: timezone column exists")
         return True
         
+    except VerificationError as e:
+        print(f"✗ Migration verification failed: {e}")
+        return False
     except sqlite3.Error as e:
         print(f"✗ Database error during migration: {e}")
         return False
@@ -4,25 +4,15 @@ Migration script to add login_logo_max_height column to the styling_settings tab
 This allows separate logo sizing for navbar and login page.
 """
 
-import os
-import sys
-from pathlib import Path
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-# Add the src directory to the Python path
-src_dir = Path(__file__).parent / "src"
-sys.path.insert(0, str(src_dir))
-
-from booking.database import engine, SessionLocal
+from booking.database import engine
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from _common import optimize_engine_connection, tune_engine_connections
 
-
-def check_column_exists():
-    """Check if the login_logo_max_height column already exists"""
-    with engine.connect() as conn:
-        result = conn.execute(text("PRAGMA table_info(styling_settings)"))
-        columns = [row[1] for row in result.fetchall()]
-        return 'login_logo_max_height' in columns
-
+# Apply the migration PRAGMAs to every connection the engine opens
+tune_engine_connections()
 
 def check_table_exists():
     """Check if the styling_settings table exists"""
@@ -43,39 +33,26 @@ def migrate_login_logo_size():
         print("❌ styling_settings table does not exist. Please run migrate_styling_settings.py first.")
         return
     
-    # Check if column already exists
-    if check_column_exists():
-        print("✅ login_logo_max_height column already exists. Migration skipped.")
-        return
-    
     try:
-        # Add the new column
+        # One connection and one transaction for the whole migration
         with engine.connect() as conn:
-            conn.execute(text("""
-                ALTER TABLE styling_settings 
-                ADD COLUMN login_logo_max_height INTEGER DEFAULT 100
-            """))
-            conn.commit()
-        
-        print("✅ Added login_logo_max_height column successfully!")
-        
-        # Update existing records to have the default value
-        db = SessionLocal()
-        try:
-            db.execute(text("""
-                UPDATE styling_settings 
-                SET login_logo_max_height = 100 
-                WHERE login_logo_max_height IS NULL
-            """))
-            db.commit()
-            print("✅ Updated existing records with default login logo size!")
-            
-        except Exception as e:
-            print(f"❌ Error updating existing records: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            # Add the new column; SQLite reports an existing one as a duplicate.
+            # The constant DEFAULT also applies to existing rows, no backfill needed.
+            try:
+                with conn.begin():
+                    conn.execute(text("""
+                        ALTER TABLE styling_settings 
+                        ADD COLUMN login_logo_max_height INTEGER DEFAULT 100
+                    """))
+            except OperationalError as e:
+                if 'duplicate column' not in str(e).lower():
+                    raise
+                print("✅ login_logo_max_height column already exists. Migration skipped.")
+                return
             
+            print("✅ Added login_logo_max_height column successfully!")
+            optimize_engine_connection(conn)
+        
         print("🎨 Login logo size migration completed successfully!")
         
     except Exception as e:
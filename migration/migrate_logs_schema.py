@@ -3,17 +3,26 @@
 Migration script to add new columns to log_entries table
 """
 
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, text, Column, String, Integer, JSON
-from src.booking.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy import text, Column, String, Integer, JSON
+from src.booking.database import engine
+from _common import optimize_engine_connection, tune_engine_connections
+
+# Apply the migration PRAGMAs to every connection the engine opens
+tune_engine_connections()
+
+# Columns added to log_entries by this migration
+NEW_COLUMNS = [
+    ("module", "TEXT"),
+    ("function", "TEXT"),
+    ("line_number", "INTEGER"),
+    ("request_id", "TEXT"),
+    ("extra_data", "JSON"),
+]
 
 def migrate_logs_schema():
     """Add new columns to log_entries table"""
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    
     with engine.connect() as conn:
         # Start a transaction
         trans = conn.begin()
@@ -21,25 +30,17 @@ def migrate_logs_schema():
         try:
             print("Adding new columns to log_entries table...")
             
-            # Add new columns to log_entries table
-            columns_to_add = [
-                "ALTER TABLE log_entries ADD COLUMN module TEXT",
-                "ALTER TABLE log_entries ADD COLUMN function TEXT", 
-                "ALTER TABLE log_entries ADD COLUMN line_number INTEGER",
-                "ALTER TABLE log_entries ADD COLUMN request_id TEXT",
-                "ALTER TABLE log_entries ADD COLUMN extra_data JSON"
-            ]
+            columns = conn.execute(text("PRAGMA table_info(log_entries)")).fetchall()
+            existing = {column[1] for column in columns}
+            missing = [(name, type_) for name, type_ in NEW_COLUMNS if name not in existing]
+            for name, type_ in NEW_COLUMNS:
+                if name in existing:
+                    print(f"⚠️  Column already exists: {name} {type_}")
             
-            for sql in columns_to_add:
-                try:
-                    conn.execute(text(sql))
-                    print(f"✅ Added column: {sql.split('ADD COLUMN ')[1]}")
-                except Exception as e:
-                    if "duplicate column name" in str(e).lower() or "already exists" in str(e).lower():
-                        print(f"⚠️  Column already exists: {sql.split('ADD COLUMN ')[1]}")
-                    else:
-                        print(f"❌ Error adding column: {e}")
-                        raise
+            # ADD COLUMN only rewrites the schema, not the (large) table itself
+            for name, type_ in missing:
+                conn.execute(text(f"ALTER TABLE log_entries ADD COLUMN {name} {type_}"))
+                print(f"✅ Added column: {name} {type_}")
             
             # Create indexes for new columns
             indexes_to_create = [
@@ -55,6 +56,7 @@ def migrate_logs_schema():
             
             # Commit the transaction
             trans.commit()
+            optimize_engine_connection(conn)
             print("✅ Log entries schema migration completed successfully!")
             
         except Exception as e:
@@ -4,66 +4,77 @@ This adds dynamic claims mapping and enhanced reporting capabilities
 """
 
 import sys
-import os
-from pathlib import Path
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 import logging
 
-# Add the src directory to the path to import models
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
 from booking.database import SQLALCHEMY_DATABASE_URL, engine
 from booking.models import Base, OIDCClaimMapping, UserProfile, ReportColumn, ReportTemplate
+from _common import optimize_engine_connection, seed_rows, tune_engine_connections
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Apply the migration PRAGMAs to every connection the engine opens
+tune_engine_connections()
+
+# Default report columns for static fields, in _REPORT_COLUMN_FIELDS order
+_REPORT_COLUMN_FIELDS = ("column_name", "display_label", "column_type", "data_type", "sort_order")
+_DEFAULT_COLUMNS = [
+    ("email", "Email", "static", "string", 1),
+    ("is_admin", "Is Admin", "static", "boolean", 2),
+    ("total_bookings", "Total Bookings", "calculated", "number", 10),
+    ("total_hours", "Total Hours", "calculated", "number", 11),
+    ("avg_duration", "Avg Duration (hours)", "calculated", "number", 12),
+    ("parking_lots_used", "Parking Lots Used", "calculated", "number", 13),
+    ("license_plates", "License Plates Used", "calculated", "number", 14),
+]
+
+# Spells out the model defaults for is_available and the NOT NULL timestamps
+_REPORT_COLUMN_CONSTANTS = {
+    "is_available": "1",
+    "created_at": "CURRENT_TIMESTAMP",
+    "updated_at": "CURRENT_TIMESTAMP",
+}
+
 def run_migration():
     """Run the migration to add OIDC claims mapping tables"""
     
     try:
-        logger.info(f"Connecting to database: {SQLALCHEMY_DATABASE_URL}")
+        logger.info("Connecting to database: %s", SQLALCHEMY_DATABASE_URL)
         
         # Create tables
         logger.info("Creating new tables for OIDC claims mapping...")
         
-        # Create the new tables
-        OIDCClaimMapping.__table__.create(engine, checkfirst=True)
-        logger.info("✓ Created oidc_claim_mappings table")
-        
-        UserProfile.__table__.create(engine, checkfirst=True)
-        logger.info("✓ Created user_profiles table")
-        
-        ReportColumn.__table__.create(engine, checkfirst=True)
-        logger.info("✓ Created report_columns table")
-        
-        ReportTemplate.__table__.create(engine, checkfirst=True)
-        logger.info("✓ Created report_templates table")
+        # Create the new tables on one connection, in one transaction
+        new_tables = [
+            OIDCClaimMapping.__table__,
+            UserProfile.__table__,
+            ReportColumn.__table__,
+            ReportTemplate.__table__,
+        ]
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn, tables=new_tables, checkfirst=True)
+        for table in new_tables:
+            logger.info("✓ Created %s table", table.name)
         
         # Create session for data insertion
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         db = SessionLocal()
         
         try:
-            # Insert default report columns for static fields
-            default_columns = [
-                {"column_name": "email", "display_label": "Email", "column_type": "static", "data_type": "string", "sort_order": 1},
-                {"column_name": "is_admin", "display_label": "Is Admin", "column_type": "static", "data_type": "boolean", "sort_order": 2},
-                {"column_name": "total_bookings", "display_label": "Total Bookings", "column_type": "calculated", "data_type": "number", "sort_order": 10},
-                {"column_name": "total_hours", "display_label": "Total Hours", "column_type": "calculated", "data_type": "number", "sort_order": 11},
-                {"column_name": "avg_duration", "display_label": "Avg Duration (hours)", "column_type": "calculated", "data_type": "number", "sort_order": 12},
-                {"column_name": "parking_lots_used", "display_label": "Parking Lots Used", "column_type": "calculated", "data_type": "number", "sort_order": 13},
-                {"column_name": "license_plates", "display_label": "License Plates Used", "column_type": "calculated", "data_type": "number", "sort_order": 14},
-            ]
-            
-            for col_data in default_columns:
-                # Check if column already exists
-                existing = db.query(ReportColumn).filter(ReportColumn.column_name == col_data["column_name"]).first()
-                if not existing:
-                    column = ReportColumn(**col_data)
-                    db.add(column)
+            # Insert default report columns; the UNIQUE constraint on column_name
+            # skips columns that already exist
+            seed_rows(
+                db.connection().connection.driver_connection,
+                "report_columns",
+                _REPORT_COLUMN_FIELDS,
+                _DEFAULT_COLUMNS,
+                constants=_REPORT_COLUMN_CONSTANTS,
+            )
             
             db.commit()
             logger.info("✓ Inserted default report columns")
@@ -88,15 +99,17 @@ def run_migration():
             
         except Exception as e:
             db.rollback()
-            logger.error(f"Error inserting default data: {e}")
+            logger.error("Error inserting default data: %s", e)
             raise
         finally:
             db.close()
         
+        with engine.connect() as conn:
+            optimize_engine_connection(conn)
         logger.info("Migration completed successfully!")
         
     except Exception as e:
-        logger.error(f"Migration failed: {e}")
+        logger.error("Migration failed: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -7,112 +7,100 @@ user-friendly names for login buttons, solving issues with special
 characters and spaces in issuer names.
 """
 
+import re
 import sqlite3
 import logging
+from contextlib import closing
+
+from _common import add_column_if_missing, connect, immediate_transaction
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def migrate_display_name():
-    """Add display_name column to oidc_providers table."""
+# Protocol prefix and common OIDC paths, stripped in a single pass
+_STRIP_RE = re.compile(r'^https?://|/\.well-known/openid_configuration|/oauth2|/auth')
+
+# Substrings identifying well-known providers, checked in order
+KNOWN_PROVIDERS = {
+    'google': 'Google',
+    'microsoft': 'Microsoft',
+    'azure': 'Microsoft',
+    'okta': 'Okta',
+    'auth0': 'Auth0',
+    'keycloak': 'Keycloak',
+}
+
+def _derive_display_name(issuer):
+    """Generate a user-friendly display name from an issuer URL"""
+    display_name = _STRIP_RE.sub('', issuer)
+    
+    # Handle common providers
+    lowered = display_name.lower()
+    for key, pretty_name in KNOWN_PROVIDERS.items():
+        if key in lowered:
+            return pretty_name
+    
+    # For custom domains, use the domain name, capitalized
+    return display_name.split('/', 1)[0].capitalize()
+
+def migrate_display_name(conn=None):
+    """Add display_name column to oidc_providers table.
+    
+    Uses the given connection and leaves it open, or opens and closes its own.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
     
     try:
-        # Connect to the database
-        conn = sqlite3.connect('booking.db')
-        cursor = conn.cursor()
-        
-        # Check if display_name column already exists
-        cursor.execute("PRAGMA table_info(oidc_providers)")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        
-        if 'display_name' in column_names:
-            logger.info("display_name column already exists in oidc_providers table")
-            return
-        
-        logger.info("Adding display_name column to oidc_providers table...")
-        
-        # Add the display_name column
-        cursor.execute("ALTER TABLE oidc_providers ADD COLUMN display_name TEXT")
-        
-        # Update existing providers with a default display name based on issuer
-        # Remove protocol and simplify common issuer URLs
-        logger.info("Setting default display names for existing providers...")
-        cursor.execute("SELECT id, issuer FROM oidc_providers")
-        providers = cursor.fetchall()
-        
-        for provider_id, issuer in providers:
-            # Generate a user-friendly display name from the issuer
-            display_name = issuer
+        # Commit the ALTER and UPDATEs together
+        with immediate_transaction(conn):
+            if not add_column_if_missing(conn, "oidc_providers", "display_name", "TEXT"):
+                logger.info("display_name column already exists in oidc_providers table")
+                return
             
-            # Remove https:// or http://
-            if display_name.startswith('https://'):
-                display_name = display_name[8:]
-            elif display_name.startswith('http://'):
-                display_name = display_name[7:]
+            logger.info("Adding display_name column to oidc_providers table...")
             
-            # Remove common OIDC paths
-            display_name = display_name.replace('/.well-known/openid_configuration', '')
-            display_name = display_name.replace('/oauth2', '')
-            display_name = display_name.replace('/auth', '')
+            # Update existing providers with a default display name based on issuer
+            # Remove protocol and simplify common issuer URLs
+            logger.info("Setting default display names for existing providers...")
+            providers = conn.execute("SELECT id, issuer FROM oidc_providers").fetchall()
             
-            # Handle common providers
-            if 'google' in display_name.lower():
-                display_name = 'Google'
-            elif 'microsoft' in display_name.lower() or 'azure' in display_name.lower():
-                display_name = 'Microsoft'
-            elif 'okta' in display_name.lower():
-                display_name = 'Okta'
-            elif 'auth0' in display_name.lower():
-                display_name = 'Auth0'
-            elif 'keycloak' in display_name.lower():
-                display_name = 'Keycloak'
-            else:
-                # For custom domains, use the domain name
-                if '/' in display_name:
-                    display_name = display_name.split('/')[0]
-                
-                # Capitalize first letter
-                display_name = display_name.capitalize()
+            updates = [(_derive_display_name(issuer), provider_id) for provider_id, issuer in providers]
+            logger.info("Setting display names for %d providers", len(updates))
             
-            logger.info(f"Setting display name for provider {provider_id}: '{issuer}' -> '{display_name}'")
-            cursor.execute(
-                "UPDATE oidc_providers SET display_name = ? WHERE id = ?",
-                (display_name, provider_id)
-            )
-        
-        # Commit the changes
-        conn.commit()
+            # One prepared statement for all rows
+            conn.executemany("UPDATE oidc_providers SET display_name = ? WHERE id = ?", updates)
         logger.info("Successfully added display_name column and updated existing providers")
         
     except sqlite3.Error as e:
-        logger.error(f"Database error during migration: {e}")
-        if conn:
-            conn.rollback()
+        logger.error("Database error during migration: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during migration: {e}")
-        if conn:
-            conn.rollback()
+        logger.error("Unexpected error during migration: %s", e)
         raise
     finally:
-        if conn:
+        if own_conn:
             conn.close()
 
-def verify_migration():
-    """Verify that the migration was successful."""
+def verify_migration(conn=None):
+    """Verify that the migration was successful.
+    
+    Uses the given connection and leaves it open, or opens and closes its own.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+    cursor = conn.cursor()
+    
     try:
-        conn = sqlite3.connect('booking.db')
-        cursor = conn.cursor()
-        
-        # Check table structure
-        cursor.execute("PRAGMA table_info(oidc_providers)")
-        columns = cursor.fetchall()
-        
-        logger.info("Current oidc_providers table structure:")
-        for column in columns:
-            logger.info(f"  {column[1]} ({column[2]})")
+        # The table structure is only worth reading when it will be logged
+        if logger.isEnabledFor(logging.DEBUG):
+            cursor.execute("PRAGMA table_info(oidc_providers)")
+            logger.debug("Current oidc_providers table structure:")
+            for column in cursor:
+                logger.debug("  %s (%s)", column[1], column[2])
         
         # Check current providers
         cursor.execute("SELECT id, issuer, display_name FROM oidc_providers")
@@ -121,18 +109,20 @@ def verify_migration():
         if providers:
             logger.info("Current OIDC providers:")
             for provider_id, issuer, display_name in providers:
-                logger.info(f"  ID {provider_id}: '{issuer}' -> '{display_name}'")
+                logger.info("  ID %s: '%s' -> '%s'", provider_id, issuer, display_name)
         else:
             logger.info("No OIDC providers found in database")
             
     except Exception as e:
-        logger.error(f"Error during verification: {e}")
+        logger.error("Error during verification: %s", e)
     finally:
-        if conn:
+        if own_conn:
             conn.close()
 
 if __name__ == "__main__":
     logger.info("Starting OIDC display_name migration...")
-    migrate_display_name()
-    verify_migration()
+    # One connection for both steps
+    with closing(connect()) as conn:
+        migrate_display_name(conn)
+        verify_migration(conn)
     logger.info("Migration completed successfully!")
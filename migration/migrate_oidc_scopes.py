@@ -1,60 +1,33 @@
 """
 Migration script to add scopes column to OIDC providers table
 """
-import sqlite3
 import logging
 
+from _common import add_column_if_missing, open_migration_db
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def migrate_oidc_scopes():
     """Add scopes column to oidc_providers table if it doesn't exist"""
     try:
-        # Connect to the database
-        conn = sqlite3.connect('booking.db')
-        cursor = conn.cursor()
-        
-        # Check if the scopes column already exists
-        cursor.execute("PRAGMA table_info(oidc_providers)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'scopes' not in columns:
-            logger.info("Adding 'scopes' column to oidc_providers table...")
-            
-            # Add the scopes column with default value
-            cursor.execute("""
-                ALTER TABLE oidc_providers 
-                ADD COLUMN scopes TEXT DEFAULT 'openid email profile'
-            """)
-            
-            # Update existing providers to have the default scopes
-            cursor.execute("""
-                UPDATE oidc_providers 
-                SET scopes = 'openid email profile' 
-                WHERE scopes IS NULL OR scopes = ''
-            """)
-            
-            conn.commit()
-            logger.info("Successfully added 'scopes' column to oidc_providers table")
+        # ADD COLUMN with a constant DEFAULT backfills existing rows without rewriting them
+        with open_migration_db() as conn:
+            if not add_column_if_missing(conn, "oidc_providers", "scopes", "TEXT DEFAULT 'openid email profile'"):
+                logger.info("'scopes' column already exists in oidc_providers table")
+                return
+            logger.info("Added 'scopes' column to oidc_providers table")
             
             # Verify the migration
-            cursor.execute("SELECT issuer, scopes FROM oidc_providers")
-            providers = cursor.fetchall()
-            logger.info(f"Updated {len(providers)} OIDC providers with default scopes:")
-            for provider in providers:
-                logger.info(f"  - {provider[0]}: '{provider[1]}'")
-                
-        else:
-            logger.info("'scopes' column already exists in oidc_providers table")
+            providers = conn.execute("SELECT issuer, scopes FROM oidc_providers").fetchall()
+        
+        logger.info("%d OIDC providers now have the default scopes:", len(providers))
+        for issuer, scopes in providers:
+            logger.info("  - %s: '%s'", issuer, scopes)
             
     except Exception as e:
-        logger.error(f"Migration failed: {e}")
-        if conn:
-            conn.rollback()
+        logger.error("Migration failed: %s", e)
         raise
-    finally:
-        if conn:
-            conn.close()
 
 if __name__ == "__main__":
     migrate_oidc_scopes()
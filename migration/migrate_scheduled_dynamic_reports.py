@@ -4,19 +4,19 @@ Migration script to create the scheduled_dynamic_reports table
 """
 
 import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, inspect
-from src.booking.database import SQLALCHEMY_DATABASE_URL, Base
+from sqlalchemy import inspect
+from src.booking.database import Base, engine
 from src.booking.models import ScheduledDynamicReport
+from _common import optimize_engine_connection, tune_engine_connections
+
+# Apply the migration PRAGMAs to every connection the engine opens
+tune_engine_connections()
 
 def migrate_scheduled_dynamic_reports():
     """Create the scheduled_dynamic_reports table"""
     
-    # Create engine
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-    
     # Check if table already exists
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
@@ -29,6 +29,8 @@ def migrate_scheduled_dynamic_reports():
         # Create the table
         print("🔄 Creating ScheduledDynamicReport table...")
         ScheduledDynamicReport.__table__.create(engine)
+        with engine.connect() as conn:
+            optimize_engine_connection(conn)
         print("✅ ScheduledDynamicReport table created successfully!")
         
     except Exception as e:
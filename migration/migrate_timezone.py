@@ -6,6 +6,8 @@ import sqlite3
 import sys
 from pathlib import Path
 
+from _common import add_column_if_missing, open_migration_db
+
 def migrate_database():
     """Add timezone column to email_settings table"""
     db_path = Path("booking.db")
@@ -15,29 +17,14 @@ def migrate_database():
         return False
     
     try:
-        # Connect to the database
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        
-        # Check if timezone column already exists
-        cursor.execute("PRAGMA table_info(email_settings)")
-        columns = [column[1] for column in cursor.fetchall()]
+        # ADD COLUMN with a constant DEFAULT backfills existing rows without rewriting them
+        with open_migration_db(str(db_path)) as conn:
+            added = add_column_if_missing(conn, "email_settings", "timezone", "TEXT DEFAULT 'UTC'")
         
-        if 'timezone' in columns:
+        if not added:
             print("Timezone column already exists in email_settings table")
-            conn.close()
             return True
         
-        # Add the timezone column with default value 'UTC'
-        cursor.execute("ALTER TABLE email_settings ADD COLUMN timezone TEXT DEFAULT 'UTC'")
-        
-        # Update existing records to have UTC timezone
-        cursor.execute("UPDATE email_settings SET timezone = 'UTC' WHERE timezone IS NULL")
-        
-        # Commit the changes
-        conn.commit()
-        conn.close()
-        
         print("Successfully added timezone column to email_settings table")
         return True
         
@@ -1,77 +1,106 @@
 """
 Migration to fix user deletion by allowing bookings to have NULL user_id when user is deleted
 """
-import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from src.booking.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy import text
+from src.booking.database import engine
+from _common import optimize_engine_connection, tune_engine_connections
+
+# Apply the migration PRAGMAs to every connection the engine opens
+tune_engine_connections()
+
+# Rows copied (and committed) per INSERT ... SELECT
+COPY_CHUNK_SIZE = 30000
+
+COPY_CHUNK_SQL = text("""
+    INSERT INTO bookings_new (
+        id, space_id, user_id, start_time, end_time, license_plate, 
+        is_cancelled, deleted_space_info
+    )
+    SELECT 
+        id, space_id, user_id, start_time, end_time, license_plate, 
+        is_cancelled, deleted_space_info
+    FROM bookings
+    WHERE id > :last_id
+    ORDER BY id
+    LIMIT :limit
+""")
 
 def migrate_user_cascade_delete():
     """
     Migrate to allow user deletion by making user_id nullable in bookings
     and recreating the foreign key with SET NULL on delete
     """
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    
-    try:
-        print("🔄 Starting user cascade delete migration...")
-        
-        # Step 0: Clean up any previous failed migration attempts
+    # A single connection, so the foreign_keys PRAGMA holds across the chunk commits
+    with engine.connect() as conn:
         try:
-            session.execute(text("DROP TABLE IF EXISTS bookings_new"))
-            print("🧹 Cleaned up any existing bookings_new table")
-        except:
-            pass
-        
-        # Step 1: Create a new bookings table with nullable user_id and proper foreign key
-        session.execute(text("""
-            CREATE TABLE bookings_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                space_id INTEGER,
-                user_id INTEGER,
-                start_time DATETIME,
-                end_time DATETIME,
-                license_plate VARCHAR,
-                is_cancelled BOOLEAN DEFAULT 0,
-                deleted_space_info VARCHAR,
-                FOREIGN KEY(space_id) REFERENCES parking_spaces (id) ON DELETE SET NULL,
-                FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE SET NULL
-            )
-        """))
-        
-        # Step 2: Copy all data from old table to new table
-        session.execute(text("""
-            INSERT INTO bookings_new (
-                id, space_id, user_id, start_time, end_time, license_plate, 
-                is_cancelled, deleted_space_info
-            )
-            SELECT 
-                id, space_id, user_id, start_time, end_time, license_plate, 
-                is_cancelled, deleted_space_info
-            FROM bookings
-        """))
-        
-        # Step 3: Drop old table
-        session.execute(text("DROP TABLE bookings"))
-        
-        # Step 4: Rename new table to original name
-        session.execute(text("ALTER TABLE bookings_new RENAME TO bookings"))
-        
-        session.commit()
-        print("✅ User cascade delete migration completed successfully!")
-        print("   Users can now be deleted safely - their bookings will have user_id set to NULL")
-        
-    except Exception as e:
-        print(f"❌ Migration failed: {e}")
-        session.rollback()
-        raise
-    finally:
-        session.close()
+            print("🔄 Starting user cascade delete migration...")
+            
+            # The copy and the table swap are not checked row by row.
+            # defer_foreign_keys would add nothing: it is ignored while
+            # foreign_keys is OFF and reset by every chunk commit anyway
+            conn.execute(text("PRAGMA foreign_keys = OFF"))
+            
+            # Step 0: Clean up any previous failed migration attempts
+            try:
+                conn.execute(text("DROP TABLE IF EXISTS bookings_new"))
+                print("🧹 Cleaned up any existing bookings_new table")
+            except:
+                pass
+            
+            # Step 1: Create a new bookings table with nullable user_id and proper foreign key
+            conn.execute(text("""
+                CREATE TABLE bookings_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    space_id INTEGER,
+                    user_id INTEGER,
+                    start_time DATETIME,
+                    end_time DATETIME,
+                    license_plate VARCHAR,
+                    is_cancelled BOOLEAN DEFAULT 0,
+                    deleted_space_info VARCHAR,
+                    FOREIGN KEY(space_id) REFERENCES parking_spaces (id) ON DELETE SET NULL,
+                    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE SET NULL
+                )
+            """))
+            conn.commit()
+            
+            # Step 2: Copy the data from old table to new table in id-ordered chunks,
+            # committing each one so the journal only ever holds a single chunk
+            last_id = 0
+            copied = 0
+            while True:
+                result = conn.execute(COPY_CHUNK_SQL, {"last_id": last_id, "limit": COPY_CHUNK_SIZE})
+                if result.rowcount <= 0:
+                    break
+                copied += result.rowcount
+                last_id = conn.execute(text("SELECT MAX(id) FROM bookings_new")).scalar()
+                conn.commit()
+            print(f"📋 Copied {copied} bookings")
+            
+            # Step 3: Drop old table
+            conn.execute(text("DROP TABLE bookings"))
+            
+            # Step 4: Rename new table to original name
+            conn.execute(text("ALTER TABLE bookings_new RENAME TO bookings"))
+            
+            # Step 5: Recreate the foreign key indexes dropped with the old table;
+            # SET NULL on user deletion looks bookings up by user_id
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bookings_space_id ON bookings (space_id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bookings_user_id ON bookings (user_id)"))
+            
+            conn.commit()
+            optimize_engine_connection(conn)
+            print("✅ User cascade delete migration completed successfully!")
+            print("   Users can now be deleted safely - their bookings will have user_id set to NULL")
+            
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("PRAGMA foreign_keys = ON"))
 
 if __name__ == "__main__":
     migrate_user_cascade_delete()
@@ -1,15 +1,15 @@
 """
 Restore users that were deleted during testing
 """
+import argparse
 import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from src.booking.database import SQLALCHEMY_DATABASE_URL, pwd_context
 
-def restore_deleted_users():
+def restore_deleted_users(bcrypt_rounds=12):
     """Restore users deleted during testing"""
     engine = create_engine(SQLALCHEMY_DATABASE_URL)
     Session = sessionmaker(bind=engine)
@@ -18,60 +18,46 @@ def restore_deleted_users():
     try:
         print("🔄 Restoring deleted users...")
         
-        # Check current users
-        result = session.execute(text("SELECT id, email FROM users ORDER BY id"))
-        current_users = result.fetchall()
-        print("\n📋 Current users:")
-        for user in current_users:
-            print(f"  User {user[0]}: {user[1]}")
-        
-        # Restore the initial admin user (ID 1) if missing
-        admin_exists = any(user[0] == 1 for user in current_users)
-        if not admin_exists:
-            print("\n🔄 Restoring initial admin user (ID 1)...")
+        # Restore the initial admin user (ID 1) if missing; the bcrypt hash is
+        # only computed when the row is actually absent
+        admin_exists = session.execute(text("SELECT 1 FROM users WHERE id = 1")).first()
+        if admin_exists:
+            print("✅ Initial admin user already exists")
+        else:
             # Use environment variables if available, otherwise use defaults
             admin_email = os.getenv("INITIAL_ADMIN_EMAIL", "admin@example.com")
             admin_password = os.getenv("INITIAL_ADMIN_PASSWORD", "admin")
-            hashed_password = pwd_context.hash(admin_password)
+            hashed_password = pwd_context.copy(bcrypt__rounds=bcrypt_rounds).hash(admin_password)
             
             session.execute(text("""
                 INSERT INTO users (id, email, hashed_password, is_admin) 
                 VALUES (1, :email, :password, 1)
+                ON CONFLICT(id) DO NOTHING
             """), {"email": admin_email, "password": hashed_password})
             print(f"✅ Restored admin user: {admin_email}")
-        else:
-            print("✅ Initial admin user already exists")
         
-        # Check if we need to restore the bookings' user_id references
-        result = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id IS NULL"))
-        null_bookings = result.fetchone()[0]
+        # Read the users once, for the admin lookup and the final list
+        result = session.execute(text("SELECT id, email, is_admin FROM users ORDER BY id"))
+        users = [tuple(user) for user in result]
         
-        if null_bookings > 0:
-            print(f"\n📊 Found {null_bookings} bookings with NULL user_id")
-            
-            # Try to restore bookings to the admin user if they were orphaned
-            result = session.execute(text("SELECT id FROM users WHERE is_admin = 1 LIMIT 1"))
-            admin_user = result.fetchone()
+        # Reassign orphaned bookings to the first admin user; the UPDATE's
+        # rowcount tells how many there were
+        admin_id = next((user[0] for user in users if user[2]), None)
+        if admin_id is not None:
+            result = session.execute(text("""
+                UPDATE bookings 
+                SET user_id = :admin_id 
+                WHERE user_id IS NULL
+            """), {"admin_id": admin_id})
             
-            if admin_user:
-                admin_id = admin_user[0]
-                print(f"🔄 Reassigning orphaned bookings to admin user (ID {admin_id})...")
-                
-                session.execute(text("""
-                    UPDATE bookings 
-                    SET user_id = :admin_id 
-                    WHERE user_id IS NULL
-                """), {"admin_id": admin_id})
-                
-                print(f"✅ Reassigned {null_bookings} orphaned bookings to admin user")
+            if result.rowcount > 0:
+                print(f"\n✅ Reassigned {result.rowcount} orphaned bookings to admin user (ID {admin_id})")
         
         session.commit()
         
         # Show final user list
-        result = session.execute(text("SELECT id, email, is_admin FROM users ORDER BY id"))
-        final_users = result.fetchall()
         print("\n📋 Final user list:")
-        for user in final_users:
+        for user in users:
             admin_flag = " (ADMIN)" if user[2] else ""
             print(f"  User {user[0]}: {user[1]}{admin_flag}")
         
@@ -85,4 +71,16 @@ def restore_deleted_users():
         session.close()
 
 if __name__ == "__main__":
-    restore_deleted_users()
+    parser = argparse.ArgumentParser(description="Restore users deleted during testing.")
+    parser.add_argument(
+        "--bcrypt-rounds",
+        type=int,
+        default=12,
+        help="bcrypt cost factor for the restored admin password (4-31). Lower values "
+             "hash faster for throwaway test databases; keep the default elsewhere."
+    )
+    args = parser.parse_args()
+    if not 4 <= args.bcrypt_rounds <= 31:
+        parser.error("--bcrypt-rounds must be between 4 and 31")
+
+    restore_deleted_users(bcrypt_rounds=args.bcrypt_rounds)
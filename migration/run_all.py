@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Run the legacy column/table migration scripts, in parallel where they touch
+different tables.
+
+Scripts that change the same table form a group and run one after another,
+in the order listed; independent groups run concurrently. Each script runs
+in its own interpreter, exactly as when started by hand from the project
+root, so their differing import setups do not interfere.
+
+The table-rebuild scripts (cascade delete, booking preservation, user
+cascade delete) and the cleanup/fix scripts are not included; run those
+individually.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MIGRATION_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(MIGRATION_DIR)
+
+# Target table(s) -> scripts that must run in this order
+MIGRATION_GROUPS = {
+    "email_settings": [
+        "migrate_email_timezone.py",
+        "migrate_dynamic_reports_scheduling.py",
+    ],
+    "oidc_providers": [
+        "migrate_oidc_scopes.py",
+        "migrate_oidc_display_name.py",
+    ],
+    "styling_settings": [
+        "migrate_styling_settings.py",
+        "migrate_login_logo_size.py",
+    ],
+    "log_entries": [
+        "migrate_logs_schema.py",
+    ],
+    "claims mapping and report tables": [
+        "migrate_oidc_claims_mapping.py",
+    ],
+    "scheduled_dynamic_reports": [
+        "migrate_scheduled_dynamic_reports.py",
+    ],
+    "backup_settings": [
+        "migrate_backup_settings.py",
+    ],
+}
+
+def run_script(script):
+    """Run one migration script from the project root and return its result"""
+    return subprocess.run(
+        [sys.executable, os.path.join(MIGRATION_DIR, script)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+def run_group(scripts):
+    """Run a group's scripts in order, stopping at the first failure"""
+    results = []
+    for script in scripts:
+        result = run_script(script)
+        results.append((script, result))
+        if result.returncode != 0:
+            break
+    return results
+
+def run_all(max_workers=4):
+    """Run all migration groups concurrently; return True if every script succeeded"""
+    success = True
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_group, scripts): group for group, scripts in MIGRATION_GROUPS.items()}
+        for future in as_completed(futures):
+            group = futures[future]
+            print(f"\n📦 {group}")
+            for script, result in future.result():
+                ok = result.returncode == 0
+                success = success and ok
+                print(f"{'✅' if ok else '❌'} {script}")
+                output = (result.stdout + result.stderr).strip()
+                if output:
+                    print("\n".join(f"    {line}" for line in output.splitlines()))
+    return success
+
+def main():
+    """Main migration function"""
+    print("🚀 Running migrations...")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    success = run_all()
+
+    print("=" * 60)
+    print(f"⏱️  Finished in {time.perf_counter() - started:.2f}s")
+    if success:
+        print("✅ All migrations completed successfully!")
+    else:
+        print("❌ Some migrations failed!")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,30 @@
 """
 Test user deletion through the FastAPI endpoint
 """
-import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from src.booking.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy import text
+from src.booking.database import SessionLocal
 from src.booking import models
 
 def test_api_user_deletion():
     """Test user deletion through the API"""
     
-    # Create test database session
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    # Create test database session; the shared engine enables foreign keys on every connection
+    session = SessionLocal()
     
     try:
         print("🧪 Testing API user deletion...")
         
         # Create a test user with bookings
         print("\n🆕 Creating test user with booking...")
-        session.execute(text("""
+        # RETURNING hands back the new id without a second SELECT (SQLite 3.35+)
+        test_user_id = session.execute(text("""
             INSERT INTO users (email, hashed_password, is_admin) 
             VALUES ('api_test@example.com', 'dummy_hash', 0)
-        """))
-        
-        result = session.execute(text("SELECT id FROM users WHERE email = 'api_test@example.com'"))
-        test_user_id = result.fetchone()[0]
+            RETURNING id
+        """)).scalar_one()
         print(f"✅ Created test user with ID: {test_user_id}")
         
         # Create a test booking for this user
@@ -57,10 +51,12 @@ def test_api_user_deletion():
             print("✅ User deletion API call successful!")
             print(f"   Deleted user: {result.email}")
             
-            # Check what happened to the bookings
-            remaining_bookings = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id = :user_id"), 
-                                                {"user_id": test_user_id}).fetchone()[0]
-            null_bookings = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id IS NULL")).fetchone()[0]
+            # Check what happened to the bookings, both counts in one scan
+            null_bookings, remaining_bookings = session.execute(text("""
+                SELECT COUNT(CASE WHEN user_id IS NULL THEN 1 END),
+                       COUNT(CASE WHEN user_id = :user_id THEN 1 END)
+                FROM bookings
+            """), {"user_id": test_user_id}).one()
             
             print(f"📊 Bookings still referencing deleted user: {remaining_bookings}")
             print(f"📊 Bookings with NULL user_id: {null_bookings}")
@@ -1,19 +1,15 @@
 """
 Test user deletion functionality after migration
 """
-import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from src.booking.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy import text
+from src.booking.database import SessionLocal
 
 def test_user_deletion():
     """Test that users can now be deleted safely"""
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    # The shared engine enables foreign keys on every connection
+    session = SessionLocal()
     
     try:
         print("🧪 Testing user deletion functionality...")
@@ -58,13 +54,12 @@ def test_user_deletion():
         if result.rowcount > 0:
             print("✅ User deleted successfully!")
             
-            # Check what happened to the bookings
-            result = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id IS NULL"))
-            null_bookings = result.fetchone()[0]
-            
-            result = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id = :user_id"), 
-                                    {"user_id": test_user_id})
-            remaining_bookings = result.fetchone()[0]
+            # Check what happened to the bookings, both counts in one scan
+            null_bookings, remaining_bookings = session.execute(text("""
+                SELECT COUNT(CASE WHEN user_id IS NULL THEN 1 END),
+                       COUNT(CASE WHEN user_id = :user_id THEN 1 END)
+                FROM bookings
+            """), {"user_id": test_user_id}).one()
             
             print(f"📊 Bookings with NULL user_id: {null_bookings}")
             print(f"📊 Bookings still referencing deleted user: {remaining_bookings}")
@@ -1,35 +1,19 @@
 """
 Test user deletion with foreign keys properly enabled
 """
-import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # noqa: F401  (puts the application on sys.path)
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from src.booking.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy import text
+from src.booking.database import SessionLocal
 
 def test_user_deletion_with_fk():
     """Test user deletion with foreign keys enabled"""
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    # The shared engine enables foreign keys on every connection
+    session = SessionLocal()
     
     try:
         print("🧪 Testing user deletion with foreign keys enabled...")
         
-        # Enable foreign keys for this session
-        session.execute(text("PRAGMA foreign_keys = ON"))
-        
-        # Verify foreign keys are enabled
-        result = session.execute(text("PRAGMA foreign_keys"))
-        fk_enabled = result.fetchone()[0]
-        print(f"🔧 Foreign keys enabled: {bool(fk_enabled)}")
-        
-        if not fk_enabled:
-            print("❌ Failed to enable foreign keys")
-            return
-        
         # Check current users and their bookings
         print("\n📋 Current users and bookings:")
         result = session.execute(text("""
@@ -46,13 +30,12 @@ def test_user_deletion_with_fk():
         
         # Since user 1 was already deleted, let's create a test user with bookings
         print("\n🆕 Creating a test user...")
-        session.execute(text("""
+        # RETURNING hands back the new id without a second SELECT (SQLite 3.35+)
+        test_user_id = session.execute(text("""
             INSERT INTO users (email, hashed_password, is_admin) 
             VALUES ('test@example.com', 'dummy_hash', 0)
-        """))
-        
-        result = session.execute(text("SELECT id FROM users WHERE email = 'test@example.com'"))
-        test_user_id = result.fetchone()[0]
+            RETURNING id
+        """)).scalar_one()
         print(f"✅ Created test user with ID: {test_user_id}")
         
         # Create a test booking for this user
@@ -76,13 +59,12 @@ def test_user_deletion_with_fk():
         if result.rowcount > 0:
             print("✅ User deleted successfully!")
             
-            # Check what happened to the bookings
-            result = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id IS NULL"))
-            null_bookings = result.fetchone()[0]
-            
-            result = session.execute(text("SELECT COUNT(*) FROM bookings WHERE user_id = :user_id"), 
-                                    {"user_id": test_user_id})
-            remaining_bookings = result.fetchone()[0]
+            # Check what happened to the bookings, both counts in one scan
+            null_bookings, remaining_bookings = session.execute(text("""
+                SELECT COUNT(CASE WHEN user_id IS NULL THEN 1 END),
+                       COUNT(CASE WHEN user_id = :user_id THEN 1 END)
+                FROM bookings
+            """), {"user_id": test_user_id}).one()
             
             print(f"📊 Bookings with NULL user_id: {null_bookings}")
             print(f"📊 Bookings still referencing deleted user: {remaining_bookings}")
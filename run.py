@@ -11,10 +11,24 @@ if __name__ == "__main__":
         choices=["debug", "info", "warning", "error", "critical"],
         help="Set the logging level for the Uvicorn server."
     )
+    parser.add_argument(
+        "--reload",
+        action="store_true",
+        help="Restart the server when source files change (development only)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (ignored with --reload). Each worker runs "
+             "its own scheduler, so scheduled jobs run once per worker."
+    )
     args = parser.parse_args()
 
     create_db_and_tables()
     uvicorn.run(
-        "src.booking:app", host="0.0.0.0", port=8000, reload=True,
+        "src.booking:app", host="0.0.0.0", port=8000,
+        reload=args.reload,
+        workers=1 if args.reload else args.workers,
         log_level=args.log_level
     )
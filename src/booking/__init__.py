@@ -1,16 +1,18 @@
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 import asyncio
+import jinja2
 import logging
-import httpx
+import orjson
+from typing import Optional
 from urllib.parse import unquote
 
-from . import models, oidc
-from .database import engine, get_db
+from . import backup_service, models, oidc
+from .database import engine
 from .routers.admin import router as admin_router
 from .routers.admin import api as admin_api_router
 from .routers import bookings, users, parking_lots, auth, oidc as oidc_router
@@ -24,7 +26,19 @@ logger = get_logger("main")
 
 # Database tables will be created by create_db_and_tables() in run.py
 
-app = FastAPI()
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response serialized with orjson, several times faster than the json
+    module. fastapi.responses.ORJSONResponse is deprecated in newer FastAPI
+    releases and warns on every response, so the app keeps its own.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add session middleware for OIDC authentication
 import os
@@ -46,7 +60,14 @@ app.add_middleware(
 )
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+# Templates only change with a deployment: skip the per-render freshness
+# check and keep compiled bytecode across restarts and workers
+templates = Jinja2Templates(env=jinja2.Environment(
+    loader=jinja2.FileSystemLoader("templates"),
+    autoescape=True,
+    auto_reload=False,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+))
 
 app.include_router(bookings.router)
 app.include_router(users.router)
@@ -62,6 +83,12 @@ async def startup_event():
     """Start background tasks on application startup"""
     logger.info("Application starting up")
     initialize_oidc_providers()
+    for template_name in ("login.html", "index.html", "oidc_selection.html"):
+        templates.get_template(template_name)
+    # Fetched in the background: an unreachable IdP must not delay startup,
+    # and a login arriving meanwhile waits on the same per-provider lock
+    app.state.oidc_warmup = asyncio.create_task(oidc.warm_provider_metadata())
+    app.state.oidc_metadata_refresh = asyncio.create_task(oidc.refresh_provider_metadata_periodically())
     await start_scheduler()
     logger.info("Application startup completed")
 
@@ -71,7 +98,15 @@ async def shutdown_event():
     """Clean up background tasks on application shutdown"""
     try:
         logger.info("Application shutting down")
+        # Both fetch through oidc.http_transport, so they must be finished
+        # before it is closed
+        oidc_tasks = (app.state.oidc_warmup, app.state.oidc_metadata_refresh)
+        for task in oidc_tasks:
+            task.cancel()
+        await asyncio.gather(*oidc_tasks, return_exceptions=True)
         await stop_scheduler()
+        await oidc.close_http_transport()
+        await backup_service.close_http_client()
         logger.info("Application shutdown completed")
     except Exception as e:
         # During shutdown, logging might fail due to database teardown
@@ -83,13 +118,28 @@ async def shutdown_event():
             print(f"Warning: Error stopping scheduler: {scheduler_error}")
 
 
+# Last rendering of each page, as template name -> (providers, html). These
+# pages do not depend on the request, so they are only re-rendered when the
+# provider list they show changes
+_rendered_pages = {}
+
+
+def render_page(template_name: str, providers_data: Optional[list] = None) -> str:
+    """Render a request-independent page, reusing the last rendering for the same providers"""
+    cached = _rendered_pages.get(template_name)
+    if cached is None or cached[0] != providers_data:
+        html = templates.get_template(template_name).render(providers=providers_data)
+        cached = _rendered_pages[template_name] = (providers_data, html)
+    return cached[1]
+
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     """Landing page with smart OIDC provider handling"""
     logger.debug("Serving landing page")
     
     # Get available OIDC providers using the new helper function
-    providers_data = oidc.get_available_providers()
+    providers_data = await oidc.get_available_providers_async()
     
     if not providers_data:
         # No OIDC providers configured, redirect to local login
@@ -106,10 +156,7 @@ async def read_root(request: Request):
     else:
         # Multiple OIDC providers, show selection page
         logger.debug(f"Multiple OIDC providers found ({len(providers_data)}), showing selection page")
-        return templates.TemplateResponse("oidc_selection.html", {
-            "request": request, 
-            "providers": providers_data
-        })
+        return HTMLResponse(render_page("oidc_selection.html", providers_data))
 
 
 @app.get("/login", response_class=HTMLResponse)
@@ -118,19 +165,16 @@ async def local_login_page(request: Request):
     logger.debug("Serving local login page")
     
     # Get available OIDC providers using the new helper function
-    providers_data = oidc.get_available_providers()
+    providers_data = await oidc.get_available_providers_async()
     
-    return templates.TemplateResponse("login.html", {
-        "request": request,
-        "providers": providers_data
-    })
+    return HTMLResponse(render_page("login.html", providers_data))
 
 
 @app.get("/app", response_class=HTMLResponse)
 async def main_app(request: Request):
     """Main application page (for authenticated users)"""
     logger.debug("Serving main application page")
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(render_page("index.html"))
 
 
 
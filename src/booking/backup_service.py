@@ -1,15 +1,114 @@
+import base64
 import os
-import shutil
+import sqlite3
 import tempfile
 import urllib.parse
-import urllib.request
+import xml.etree.ElementTree as ET
+from collections import deque
 from datetime import datetime, timezone
 from typing import Optional
 import logging
 import asyncio
 
+import httpx
+
 logger = logging.getLogger(__name__)
 
+# The backup is streamed to Azure in pieces of this size rather than read
+# into memory whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_TIMEOUT = httpx.Timeout(300.0)
+
+# Files larger than one block are uploaded as blocks (Put Block), several at a
+# time, and committed with Put Block List; a failed block is retried on its own
+UPLOAD_BLOCK_SIZE = 8 * 1024 * 1024
+UPLOAD_CONCURRENCY = 8
+UPLOAD_BLOCK_ATTEMPTS = 3
+
+# List Blobs responses are parsed as they arrive, in pieces of this size
+LIST_READ_SIZE = 64 * 1024
+
+# All backup service calls share one client, so consecutive requests to the
+# storage account reuse its connections and TLS sessions
+HTTP_TIMEOUT = httpx.Timeout(30.0)
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Backups are named BACKUP_NAME_PREFIX + YYYYMMDD_HHMMSS.db
+BACKUP_NAME_PREFIX = "booking_db_backup_"
+
+
+def _snapshot_database(db_path: str, dest_path: str, pages: int = 1024):
+    """
+    Write a consistent copy of a live SQLite database with the online backup API
+    
+    Unlike a file copy this never picks up a half-written transaction, and
+    copying in steps of pages lets the application keep writing meanwhile.
+    """
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        dest = sqlite3.connect(dest_path)
+        try:
+            source.backup(dest, pages=pages, sleep=0)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+
+
+def _read_block(file_path: str, offset: int, size: int) -> bytes:
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use in the running event loop"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    # Pooled connections belong to the loop that opened them
+    if _http_client is None or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=UPLOAD_CONCURRENCY, max_keepalive_connections=4),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared client; call on application shutdown"""
+    global _http_client, _http_client_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = _http_client_loop = None
+
+
+async def _iter_list_entries(chunks):
+    """
+    Parse a List Blobs response body given as async byte chunks
+    
+    Yields ("Name", blob name) for every blob, then ("NextMarker", marker),
+    where the marker is empty on the last page.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    async for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag in ("Name", "NextMarker"):
+                yield elem.tag, elem.text
+            elif elem.tag == "Blob":
+                # Drop the parsed blob so memory does not grow with the listing
+                elem.clear()
+    parser.close()
+
+
+async def _iter_file(file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """Yield a file's content chunk by chunk, reading off the event loop"""
+    with open(file_path, 'rb') as f:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+
 
 class AzureBlobBackupService:
     """Service for backing up SQLite database to Azure Blob Storage using SAS token"""
@@ -20,7 +119,12 @@ class AzureBlobBackupService:
         self.sas_token = sas_token
         self.base_url = f"https://{storage_account}.blob.core.windows.net"
     
-    def upload_database_backup(self, db_path: str, backup_filename: Optional[str] = None) -> dict:
+    def _signed_url(self, url: str) -> str:
+        """Append the SAS token to a blob or container URL"""
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}{self.sas_token.lstrip('?')}"
+    
+    async def upload_database_backup(self, db_path: str, backup_filename: Optional[str] = None) -> dict:
         """
         Upload SQLite database file to Azure Blob Storage
         
@@ -38,16 +142,17 @@ class AzureBlobBackupService:
             # Generate backup filename if not provided
             if backup_filename is None:
                 timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-                backup_filename = f"booking_db_backup_{timestamp}.db"
+                backup_filename = f"{BACKUP_NAME_PREFIX}{timestamp}.db"
             
-            # Create temporary copy of database to ensure consistency
+            # Snapshot the database into a temporary file to ensure consistency
             with tempfile.NamedTemporaryFile(delete=False) as temp_file:
                 temp_path = temp_file.name
-                shutil.copy2(db_path, temp_path)
             
             try:
+                await asyncio.to_thread(_snapshot_database, db_path, temp_path)
+                
                 # Upload to Azure Blob Storage
-                result = self._upload_file_to_blob(temp_path, backup_filename)
+                result = await self._upload_file_to_blob(temp_path, backup_filename)
                 return result
             finally:
                 # Clean up temporary file
@@ -62,7 +167,7 @@ class AzureBlobBackupService:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
     
-    def _upload_file_to_blob(self, file_path: str, blob_name: str) -> dict:
+    async def _upload_file_to_blob(self, file_path: str, blob_name: str) -> dict:
         """
         Upload file to Azure Blob Storage using REST API
         
@@ -77,50 +182,30 @@ class AzureBlobBackupService:
             # Construct the blob URL
             blob_url = f"{self.base_url}/{self.container_name}/{blob_name}"
             
-            # Add SAS token to URL
-            if "?" in self.sas_token:
-                full_url = f"{blob_url}{self.sas_token}"
-            else:
-                full_url = f"{blob_url}?{self.sas_token}"
+            file_size = os.path.getsize(file_path)
             
-            # Read file content
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
+            # Send request
+            client = _get_http_client()
+            if file_size <= UPLOAD_BLOCK_SIZE:
+                await self._put_blob(client, blob_url, file_path, file_size)
+            else:
+                await self._put_blob_in_blocks(client, blob_url, file_path, file_size)
             
-            # Prepare HTTP request
-            headers = {
-                'x-ms-blob-type': 'BlockBlob',
-                'Content-Type': 'application/octet-stream',
-                'Content-Length': str(len(file_content))
+            file_size_mb = file_size / (1024 * 1024)
+            logger.info(f"Database backup uploaded successfully: {blob_name} ({file_size_mb:.2f} MB)")
+            return {
+                "success": True,
+                "blob_name": blob_name,
+                "blob_url": blob_url,
+                "file_size_bytes": file_size,
+                "file_size_mb": round(file_size_mb, 2),
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
-            
-            # Create HTTP request
-            req = urllib.request.Request(full_url, data=file_content, headers=headers, method='PUT')
-            
-            # Send request
-            with urllib.request.urlopen(req) as response:
-                if response.status in [200, 201]:
-                    file_size_mb = len(file_content) / (1024 * 1024)
-                    logger.info(f"Database backup uploaded successfully: {blob_name} ({file_size_mb:.2f} MB)")
-                    return {
-                        "success": True,
-                        "blob_name": blob_name,
-                        "blob_url": blob_url,
-                        "file_size_bytes": len(file_content),
-                        "file_size_mb": round(file_size_mb, 2),
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    }
-                else:
-                    raise Exception(f"Upload failed with status: {response.status}")
                     
-        except urllib.error.HTTPError as e:
-            error_msg = f"HTTP error during upload: {e.code} - {e.reason}"
-            if hasattr(e, 'read'):
-                try:
-                    error_body = e.read().decode('utf-8')
-                    error_msg += f" - {error_body}"
-                except:
-                    pass
+        except httpx.HTTPStatusError as e:
+            error_msg = f"HTTP error during upload: {e.response.status_code} - {e.response.reason_phrase}"
+            if e.response.text:
+                error_msg += f" - {e.response.text}"
             logger.error(error_msg)
             return {
                 "success": False,
@@ -136,7 +221,66 @@ class AzureBlobBackupService:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
     
-    def test_connection(self) -> dict:
+    async def _put_blob(self, client: httpx.AsyncClient, blob_url: str, file_path: str, file_size: int):
+        """Upload a file in a single Put Blob request"""
+        # Azure's Put Blob needs the length up front, so it is taken from the
+        # file system; the body is then streamed without a chunked encoding
+        headers = {
+            'x-ms-blob-type': 'BlockBlob',
+            'Content-Type': 'application/octet-stream',
+            'Content-Length': str(file_size)
+        }
+        response = await client.put(
+            self._signed_url(blob_url), content=_iter_file(file_path), headers=headers, timeout=UPLOAD_TIMEOUT
+        )
+        response.raise_for_status()
+    
+    async def _put_blob_in_blocks(self, client: httpx.AsyncClient, blob_url: str, file_path: str, file_size: int):
+        """Upload a file as concurrently sent blocks and commit them as the blob"""
+        block_count = -(-file_size // UPLOAD_BLOCK_SIZE)
+        # Block ids must all have the same length within a blob
+        block_ids = [base64.b64encode(f"{index:08d}".encode()).decode() for index in range(block_count)]
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+        
+        try:
+            async with asyncio.TaskGroup() as tasks:
+                for index, block_id in enumerate(block_ids):
+                    tasks.create_task(
+                        self._put_block(client, semaphore, blob_url, file_path, index, block_id)
+                    )
+        except ExceptionGroup as e:
+            # The remaining blocks were cancelled; report the first failure
+            raise e.exceptions[0]
+        
+        block_list = "".join(f"<Latest>{block_id}</Latest>" for block_id in block_ids)
+        response = await client.put(
+            self._signed_url(f"{blob_url}?comp=blocklist"),
+            content=f'<?xml version="1.0" encoding="utf-8"?><BlockList>{block_list}</BlockList>',
+            headers={'x-ms-blob-content-type': 'application/octet-stream'},
+            timeout=UPLOAD_TIMEOUT
+        )
+        response.raise_for_status()
+    
+    async def _put_block(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                         blob_url: str, file_path: str, index: int, block_id: str):
+        """Upload one block, retrying connection errors and server errors"""
+        block_url = self._signed_url(
+            f"{blob_url}?comp=block&blockid={urllib.parse.quote(block_id, safe='')}"
+        )
+        async with semaphore:
+            data = await asyncio.to_thread(_read_block, file_path, index * UPLOAD_BLOCK_SIZE, UPLOAD_BLOCK_SIZE)
+            for attempt in range(1, UPLOAD_BLOCK_ATTEMPTS + 1):
+                try:
+                    response = await client.put(block_url, content=data, timeout=UPLOAD_TIMEOUT)
+                    response.raise_for_status()
+                    return
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = isinstance(e, httpx.TransportError) or e.response.status_code >= 500
+                    if not retryable or attempt == UPLOAD_BLOCK_ATTEMPTS:
+                        raise
+                    logger.warning(f"Upload of block {index} failed (attempt {attempt}), retrying: {e}")
+    
+    async def test_connection(self) -> dict:
         """
         Test connection to Azure Blob Storage by attempting to list container contents
         
@@ -145,32 +289,23 @@ class AzureBlobBackupService:
         """
         try:
             # Construct the container URL for listing blobs
-            list_url = f"{self.base_url}/{self.container_name}?restype=container&comp=list"
-            
-            # Add SAS token
-            if "?" in self.sas_token:
-                # SAS token already has parameters
-                full_url = f"{list_url}&{self.sas_token.lstrip('?')}"
-            else:
-                full_url = f"{list_url}&{self.sas_token}"
-            
-            # Create HTTP request
-            req = urllib.request.Request(full_url, method='GET')
+            list_url = f"{self.base_url}/{self.container_name}?restype=container&comp=list&maxresults=1"
             
             # Send request
-            with urllib.request.urlopen(req) as response:
-                if response.status == 200:
-                    logger.info("Azure Blob Storage connection test successful")
-                    return {
-                        "success": True,
-                        "message": "Connection to Azure Blob Storage successful",
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    }
-                else:
-                    raise Exception(f"Connection test failed with status: {response.status}")
+            response = await _get_http_client().get(self._signed_url(list_url))
+            response.raise_for_status()
+            if response.status_code == 200:
+                logger.info("Azure Blob Storage connection test successful")
+                return {
+                    "success": True,
+                    "message": "Connection to Azure Blob Storage successful",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+            else:
+                raise Exception(f"Connection test failed with status: {response.status_code}")
                     
-        except urllib.error.HTTPError as e:
-            error_msg = f"HTTP error during connection test: {e.code} - {e.reason}"
+        except httpx.HTTPStatusError as e:
+            error_msg = f"HTTP error during connection test: {e.response.status_code} - {e.response.reason_phrase}"
             logger.error(error_msg)
             return {
                 "success": False,
@@ -186,7 +321,7 @@ class AzureBlobBackupService:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
     
-    def list_backups(self, limit: int = 50) -> dict:
+    async def list_backups(self, limit: int = 50) -> dict:
         """
         List existing backup files in Azure Blob Storage
         
@@ -197,76 +332,46 @@ class AzureBlobBackupService:
             dict: List of backup files
         """
         try:
-            # Construct the container URL for listing blobs
-            list_url = f"{self.base_url}/{self.container_name}?restype=container&comp=list&maxresults={limit}"
+            # Backup names (booking_db_backup_YYYYMMDD_HHMMSS.db) sort chronologically
+            # and Azure lists in name order, so the newest backups are the last
+            # ones listed; only those are kept while paging through
+            backups = deque(maxlen=limit)
+            marker = None
+            while True:
+                list_url = (
+                    f"{self.base_url}/{self.container_name}?restype=container&comp=list"
+                    f"&prefix={BACKUP_NAME_PREFIX}"
+                )
+                if marker:
+                    list_url += f"&marker={urllib.parse.quote(marker, safe='')}"
+                
+                async with _get_http_client().stream("GET", self._signed_url(list_url)) as response:
+                    if response.status_code != 200:
+                        raise Exception(f"List backups failed with status: {response.status_code}")
+                    
+                    # Parse the XML response as it arrives rather than loading it whole
+                    chunks = response.aiter_bytes(LIST_READ_SIZE)
+                    marker = None
+                    async for tag, text in _iter_list_entries(chunks):
+                        if tag == "NextMarker":
+                            marker = text
+                        elif text and text.endswith('.db'):
+                            backups.append(text)
+                
+                if not marker:
+                    break
             
-            # Add SAS token
-            if "?" in self.sas_token:
-                full_url = f"{list_url}&{self.sas_token.lstrip('?')}"
-            else:
-                full_url = f"{list_url}&{self.sas_token}"
+            # Newest first
+            backups = list(reversed(backups))
             
-            # Create HTTP request
-            req = urllib.request.Request(full_url, method='GET')
+            logger.info(f"Found {len(backups)} backup files (requested limit: {limit})")
             
-            # Send request
-            with urllib.request.urlopen(req) as response:
-                if response.status == 200:
-                    response_data = response.read().decode('utf-8')
-                    logger.debug(f"Azure Blob list response: {response_data}")
-                    
-                    # Parse XML response - handle single line XML
-                    backups = []
-                    
-                    # Use regex to find all Name tags since XML might be on one line
-                    import re
-                    name_pattern = r'<Name>(.*?)</Name>'
-                    matches = re.findall(name_pattern, response_data)
-                    
-                    for blob_name in matches:
-                        if blob_name.endswith('.db'):
-                            backups.append(blob_name)
-                    
-                    logger.info(f"Raw backup list found: {backups}")
-                    
-                    # Sort backups by filename (which contains timestamp) - newest first
-                    # Backup filename format: booking_db_backup_YYYYMMDD_HHMMSS.db
-                    def extract_timestamp(filename):
-                        try:
-                            # Extract timestamp from filename
-                            import re
-                            match = re.search(r'(\d{8}_\d{6})', filename)
-                            if match:
-                                timestamp_str = match.group(1)
-                                # Convert to datetime for proper sorting
-                                year = int(timestamp_str[0:4])
-                                month = int(timestamp_str[4:6])
-                                day = int(timestamp_str[6:8])
-                                hour = int(timestamp_str[9:11])
-                                minute = int(timestamp_str[11:13])
-                                second = int(timestamp_str[13:15]) if len(timestamp_str) > 13 else 0
-                                return datetime(year, month, day, hour, minute, second)
-                        except:
-                            pass
-                        # Fallback to filename for sorting
-                        return filename
-                    
-                    # Sort by timestamp (newest first)
-                    backups.sort(key=extract_timestamp, reverse=True)
-                    
-                    # Apply the limit to the sorted results
-                    backups = backups[:limit]
-                    
-                    logger.info(f"Found {len(backups)} backup files (requested limit: {limit})")
-                    
-                    return {
-                        "success": True,
-                        "backups": backups,
-                        "count": len(backups),
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    }
-                else:
-                    raise Exception(f"List backups failed with status: {response.status}")
+            return {
+                "success": True,
+                "backups": backups,
+                "count": len(backups),
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
                     
         except Exception as e:
             error_msg = f"Failed to list backups: {str(e)}"
@@ -292,15 +397,15 @@ async def perform_backup():
     
     # Import database and models - use relative imports since this is in the booking package
     try:
-        from .database import get_db
+        from .database import SessionLocal
         from .models import BackupSettings
     except ImportError:
         # Fallback for when called from different contexts
-        from src.booking.database import get_db
+        from src.booking.database import SessionLocal
         from src.booking.models import BackupSettings
     
-    # Get database session
-    db = next(get_db())
+    # Get database session; closed in the finally block below
+    db = SessionLocal()
     
     try:
         # Get backup settings
@@ -332,7 +437,7 @@ async def perform_backup():
             db_path = db_path[10:]  # Remove sqlite:/// prefix
         
         # Perform backup
-        result = backup_service.upload_database_backup(db_path)
+        result = await backup_service.upload_database_backup(db_path)
         
         # Update backup status
         if result["success"]:
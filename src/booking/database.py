@@ -1,5 +1,8 @@
+import logging
 import os
+import time
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from passlib.context import CryptContext
@@ -11,33 +14,78 @@ logger = get_logger("database")
 # Check if DATABASE_URL is set in environment, otherwise use default path
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///booking.db")
 
+# Connection pool sizing, shared by the app and the CLI tools importing SessionLocal
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds before a pooled connection is replaced; SQLite file connections do
+# not go stale, so they are kept (and keep their page cache) unless set
+DB_POOL_RECYCLE = os.getenv("DB_POOL_RECYCLE")
+# Statements running longer than this many milliseconds are logged; 0 (the
+# default) disables
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "0"))
+
 # Configure database engine with proper connection pooling
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    # SQLite configuration
+    # SQLite configuration; in-memory databases get SQLAlchemy's
+    # SingletonThreadPool, which takes no QueuePool sizing arguments
+    url = make_url(SQLALCHEMY_DATABASE_URL)
+    in_memory = url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    pool_args = {} if in_memory else {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL, 
         connect_args={"check_same_thread": False},
         pool_pre_ping=True,
-        pool_recycle=300  # Recycle connections every 5 minutes
+        pool_recycle=int(DB_POOL_RECYCLE or -1),
+        **pool_args
     )
 else:
     # PostgreSQL/MySQL configuration with connection pooling
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL,
-        pool_size=10,  # Increase pool size
-        max_overflow=20,  # Allow more overflow connections
-        pool_timeout=30,  # Wait up to 30 seconds for a connection
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
         pool_pre_ping=True,  # Verify connections before use
-        pool_recycle=1800,  # Recycle connections every 30 minutes
+        pool_recycle=int(DB_POOL_RECYCLE or 3600),  # Recycle connections every hour by default
         echo=False  # Set to True for SQL debugging
     )
 
-# Enable foreign key constraints for SQLite
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+# Enable foreign key constraints for SQLite, on every pooled connection
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+if DB_SLOW_QUERY_MS > 0:
+    # Console only: the database log handler writes through this engine and
+    # would wait on the very write lock the slow statement may still hold
+    slow_query_logger = logging.getLogger("booking.database.slow_queries")
+    slow_query_logger.propagate = False
+    _slow_query_handler = logging.StreamHandler()
+    _slow_query_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    slow_query_logger.addHandler(_slow_query_handler)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the per-statement context, so statements that raise leave
+        # nothing behind on the pooled connection
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        # The database log handler's own inserts are not timed
+        if statement.startswith("INSERT INTO log_entries"):
+            return
+        elapsed_ms = (time.perf_counter() - context._query_start_time) * 1000
+        if elapsed_ms >= DB_SLOW_QUERY_MS:
+            slow_query_logger.warning("Slow query (%.0f ms): %s", elapsed_ms, " ".join(statement.split())[:500])
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
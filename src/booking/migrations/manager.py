@@ -523,10 +523,18 @@ class MigrationManager:
         ).all()
         return {migration.version: migration for migration in applied}
     
-    def get_pending_migrations(self) -> List[Type[BaseMigration]]:
-        """Get all migrations that haven't been applied yet."""
-        all_migrations = self.discover_migrations()
-        applied_migrations = self.get_applied_migrations()
+    def get_pending_migrations(self, all_migrations: Optional[List[Type[BaseMigration]]] = None,
+                               applied_migrations: Optional[Dict[str, SchemaMigration]] = None) -> List[Type[BaseMigration]]:
+        """
+        Get all migrations that haven't been applied yet.
+        
+        Already discovered/loaded migrations can be passed in to avoid repeating
+        the filesystem scan and the database query.
+        """
+        if all_migrations is None:
+            all_migrations = self.discover_migrations()
+        if applied_migrations is None:
+            applied_migrations = self.get_applied_migrations()
         
         pending = []
         for migration_class in all_migrations:
@@ -535,7 +543,8 @@ class MigrationManager:
         
         return pending
     
-    def validate_migration_integrity(self) -> List[str]:
+    def validate_migration_integrity(self, all_migrations: Optional[List[Type[BaseMigration]]] = None,
+                                     applied_migrations: Optional[Dict[str, SchemaMigration]] = None) -> List[str]:
         """
         Validate that applied migrations haven't been modified with enhanced error handling.
         
@@ -543,14 +552,20 @@ class MigrationManager:
         implements graceful handling of migration instances that cannot be created,
         and provides detailed error classification for troubleshooting.
         
+        Args:
+            all_migrations: Previously discovered migrations (discovered if omitted)
+            applied_migrations: Previously loaded applied migrations (queried if omitted)
+        
         Returns:
             List of validation error messages
         """
         errors = []
         
         # Discover migrations with enhanced error tracking
-        all_migrations = self.discover_migrations()
-        applied_migrations = self.get_applied_migrations()
+        if all_migrations is None:
+            all_migrations = self.discover_migrations()
+        if applied_migrations is None:
+            applied_migrations = self.get_applied_migrations()
         
         # Create a lookup for migration classes by version
         migration_classes = {m.version: m for m in all_migrations}
@@ -948,12 +963,19 @@ class MigrationManager:
             
             return False
     
-    def get_migration_status(self) -> Dict:
-        """Get overall migration status information with enhanced error details."""
+    def get_migration_status(self, applied_migrations: Optional[Dict[str, SchemaMigration]] = None) -> Dict:
+        """
+        Get overall migration status information with enhanced error details.
+        
+        Migrations are discovered and the applied set is loaded once, then shared
+        by the pending and integrity checks. Callers that already hold the applied
+        migrations can pass them in to skip the query.
+        """
         all_migrations = self.discover_migrations()
-        applied_migrations = self.get_applied_migrations()
-        pending_migrations = self.get_pending_migrations()
-        validation_errors = self.validate_migration_integrity()
+        if applied_migrations is None:
+            applied_migrations = self.get_applied_migrations()
+        pending_migrations = self.get_pending_migrations(all_migrations, applied_migrations)
+        validation_errors = self.validate_migration_integrity(all_migrations, applied_migrations)
         
         # Include discovery diagnostics
         discovery_errors = [
@@ -970,6 +992,7 @@ class MigrationManager:
         return {
             'total_migrations': len(all_migrations),
             'applied_count': len(applied_migrations),
+            'applied_versions': sorted(applied_migrations),
             'pending_count': len(pending_migrations),
             'validation_errors': validation_errors,
             'discovery_errors': discovery_errors,
@@ -3,6 +3,7 @@ Migration runner for automated database schema management.
 """
 
 import sys
+from collections import namedtuple
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
@@ -11,6 +12,11 @@ from .schema_version import SchemaVersionManager, validate_database_compatibilit
 from ..database import SessionLocal
 
 
+# Snapshot of the database migration state: readiness flag, status dict and
+# the (is_compatible, message, details) compatibility tuple
+MigrationState = namedtuple("MigrationState", ["ready", "status", "compatibility"])
+
+
 class MigrationRunner:
     """
     High-level interface for running database migrations.
@@ -180,10 +186,14 @@ class MigrationRunner:
         finally:
             self._close_session(session)
     
-    def get_status(self) -> dict:
+    def get_status(self, applied_migrations: Optional[dict] = None) -> dict:
         """
         Get current migration status.
         
+        Args:
+            applied_migrations: Applied migrations already loaded by the caller,
+                used instead of querying them again
+        
         Returns:
             Dictionary containing migration status information
         """
@@ -191,7 +201,7 @@ class MigrationRunner:
         
         try:
             manager = MigrationManager(session, self.migrations_dir, debug_mode=self.debug_mode)
-            return manager.get_migration_status()
+            return manager.get_migration_status(applied_migrations)
         
         finally:
             self._close_session(session)
@@ -341,6 +351,31 @@ class MigrationRunner:
         finally:
             self._close_session(session)
     
+    def describe_state(self) -> MigrationState:
+        """
+        Describe readiness, status and schema compatibility in a single pass.
+        
+        The applied migrations are read once and every check is derived from
+        that one result set.
+        
+        Returns:
+            MigrationState(ready, status, compatibility)
+        """
+        session = self._get_session()
+        
+        try:
+            manager = MigrationManager(session, self.migrations_dir, debug_mode=self.debug_mode)
+            applied_migrations = manager.get_applied_migrations()
+            
+            status = manager.get_migration_status(applied_migrations)
+            compatibility = validate_database_compatibility(applied_migrations)
+            ready = not status['has_pending'] and not status['has_errors'] and compatibility[0]
+            
+            return MigrationState(ready, status, compatibility)
+        
+        finally:
+            self._close_session(session)
+    
     def check_database_ready(self) -> bool:
         """
         Check if database is ready for application use.
@@ -349,14 +384,7 @@ class MigrationRunner:
             True if database is ready (no pending migrations or errors), False otherwise
         """
         try:
-            # Check migration status
-            status = self.get_status()
-            if status['has_pending'] or status['has_errors']:
-                return False
-            
-            # Check schema compatibility
-            is_compatible, _, _ = self.check_schema_compatibility()
-            return is_compatible
+            return self.describe_state().ready
         except Exception:
             return False
     
@@ -7,7 +7,7 @@ from .base import BaseModel, TimezoneAwareDateTime
 class Booking(BaseModel):
     __tablename__ = "bookings"
 
-    space_id = Column(Integer, ForeignKey("parking_spaces.id", ondelete="SET NULL"), nullable=True)
+    space_id = Column(Integer, ForeignKey("parking_spaces.id", ondelete="SET NULL"), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     start_time = Column(TimezoneAwareDateTime)
     end_time = Column(TimezoneAwareDateTime)
@@ -16,7 +16,7 @@ class ParkingLot(BaseModel):
 class ParkingSpace(BaseModel):
     __tablename__ = "parking_spaces"
 
-    lot_id = Column(Integer, ForeignKey("parking_lots.id", ondelete="CASCADE"))
+    lot_id = Column(Integer, ForeignKey("parking_lots.id", ondelete="CASCADE"), index=True)
     space_number = Column(String)
     position_x = Column(Integer)
     position_y = Column(Integer)
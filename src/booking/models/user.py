@@ -11,7 +11,9 @@ class User(BaseModel):
     hashed_password = Column(String)
     is_admin = Column(Boolean, default=False)
 
-    bookings = relationship("Booking", back_populates="user")
+    # bookings.user_id is ON DELETE SET NULL: let the database detach them
+    # instead of loading and updating every booking when a user is deleted
+    bookings = relationship("Booking", back_populates="user", passive_deletes=True)
     profile = relationship("UserProfile", back_populates="user", uselist=False)
 
 
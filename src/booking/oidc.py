@@ -1,20 +1,90 @@
 import os
+import asyncio
+import hashlib
 import secrets
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+import httpx
 from authlib.integrations.starlette_client import OAuth
+from sqlalchemy import select
 from fastapi import Request
 import logging
 import json
 from urllib.parse import urlencode, urlparse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 
 from . import models, security
-from .database import get_db
+from .database import SessionLocal
 from .claims_service import ClaimsMappingService, ClaimsProcessingError
 
 oauth = OAuth()
 logger = logging.getLogger(__name__)
 
+# Seconds the public provider list is served from memory; admin changes
+# invalidate it immediately
+PROVIDERS_CACHE_TTL = 60
+
+# Keep-alive connections kept open per IdP host between logins
+OIDC_HTTP_MAX_KEEPALIVE = 20
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Connection pool shared by the short-lived HTTP clients Authlib creates for
+    every metadata, token and JWKS request. Authlib closes its client after
+    each call, so closing is a no-op here; the pool is closed on shutdown.
+    Pooled connections belong to the event loop that opened them, so the pool
+    is recreated when it is used from a different loop.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        if self._transport is None or self._loop is not loop:
+            self._transport = httpx.AsyncHTTPTransport(**self._kwargs)
+            self._loop = loop
+        return self._transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._get_transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+    async def close_pool(self) -> None:
+        # A pool left over from another loop cannot be closed from this one
+        if self._transport is not None and self._loop is asyncio.get_running_loop():
+            await self._transport.aclose()
+        self._transport = self._loop = None
+
+
+http_transport = _SharedTransport(limits=httpx.Limits(max_keepalive_connections=OIDC_HTTP_MAX_KEEPALIVE))
+
+# Provider discovery documents (with their JWKS) are kept on disk so that
+# restarted or additional workers do not fetch them again
+OIDC_METADATA_CACHE_DIR = Path(
+    os.getenv("OIDC_METADATA_CACHE_DIR", Path.home() / ".cache" / "booking" / "oidc_meta")
+)
+OIDC_METADATA_CACHE_TTL = 24 * 60 * 60
+# Seconds between background refetches of every registered provider's metadata,
+# so endpoint changes and new signing keys are picked up without a login paying
+OIDC_METADATA_REFRESH_INTERVAL = int(os.getenv("OIDC_METADATA_REFRESH_INTERVAL", str(6 * 60 * 60)))
+
+# One lock per registered provider name, so concurrent first logins fetch once
+_metadata_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# (loaded_at, providers) as returned by get_available_providers()
+_providers_cache: Optional[Tuple[float, list]] = None
+_providers_cache_lock = threading.Lock()
+
 
 def get_base_url() -> str:
     """Get the base URL for the application from environment variables."""
@@ -56,6 +126,16 @@ def get_provider_name(provider: models.OIDCProvider) -> str:
         return f"provider_{provider.id}"
 
 
+def normalize_display_name(provider: models.OIDCProvider):
+    """
+    Settle the login button label when a provider is saved, so the login
+    pages can show display_name as stored: surrounding whitespace is
+    dropped and an empty name falls back to the issuer's host.
+    """
+    display_name = (provider.display_name or "").strip()
+    provider.display_name = display_name or urlparse(provider.issuer).netloc or provider.issuer
+
+
 def get_redirect_uri(provider_name: str) -> str:
     """Generate the redirect URI for a provider."""
     base_url = get_base_url()
@@ -64,8 +144,8 @@ def get_redirect_uri(provider_name: str) -> str:
 
 @contextmanager
 def get_db_session():
-    """Context manager for database sessions."""
-    db = next(get_db())
+    """Context manager for database sessions outside of a request."""
+    db = SessionLocal()
     try:
         yield db
     finally:
@@ -81,18 +161,99 @@ def register_provider(provider: models.OIDCProvider) -> str:
     logger.debug(f"Provider config - Issuer: {provider.issuer}, Redirect URI: {redirect_uri}")
     
     # Register with redirect_uri - this is the standard authlib pattern
-    oauth.register(
+    client = oauth.register(
         name=provider_name,
         client_id=provider.client_id,
         client_secret=provider.client_secret,
         server_metadata_url=provider.well_known_url,
-        client_kwargs={"scope": provider.scopes},
+        client_kwargs={"scope": provider.scopes, "transport": http_transport},
         redirect_uri=redirect_uri
     )
     
+    # Start from the metadata a previous run fetched, if it is still fresh;
+    # values from this registration (such as redirect_uri) take precedence
+    cached_metadata = _read_cached_metadata(provider.well_known_url)
+    if cached_metadata:
+        client.server_metadata.update({**cached_metadata, **client.server_metadata})
+        logger.debug(f"Loaded cached metadata for {provider_name}")
+    
     return provider_name
 
 
+def _metadata_cache_path(well_known_url: str) -> Path:
+    digest = hashlib.sha256(well_known_url.encode()).hexdigest()
+    return OIDC_METADATA_CACHE_DIR / f"{digest}.json"
+
+
+def _read_cached_metadata(well_known_url: str) -> Optional[Dict[str, Any]]:
+    """Return the cached discovery document for a provider, or None if missing or stale."""
+    path = _metadata_cache_path(well_known_url)
+    try:
+        if time.time() - path.stat().st_mtime >= OIDC_METADATA_CACHE_TTL:
+            return None
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cached_metadata(well_known_url: str, metadata: Dict[str, Any]):
+    """Persist a discovery document atomically; failures only cost a refetch later."""
+    try:
+        OIDC_METADATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=OIDC_METADATA_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, _metadata_cache_path(well_known_url))
+    except OSError as e:
+        logger.warning(f"Could not cache OIDC metadata for {well_known_url}: {e}")
+
+
+def _metadata_loaded(metadata: Dict[str, Any]) -> bool:
+    return "_loaded_at" in metadata and ("jwks" in metadata or "jwks_uri" not in metadata)
+
+
+async def load_provider_metadata(client) -> Dict[str, Any]:
+    """
+    Make sure a client has its discovery document and JWKS loaded, fetching
+    them at most once per provider and persisting them for other workers.
+    """
+    if _metadata_loaded(client.server_metadata):
+        return client.server_metadata
+    
+    async with _metadata_locks[client.name]:
+        # Another request may have loaded it while we waited for the lock
+        if _metadata_loaded(client.server_metadata):
+            return client.server_metadata
+        
+        metadata = await client.load_server_metadata()
+        if "jwks_uri" in metadata:
+            await client.fetch_jwk_set()
+        _write_cached_metadata(client._server_metadata_url, client.server_metadata)
+        return client.server_metadata
+
+
+async def refresh_provider_metadata(client) -> Dict[str, Any]:
+    """Fetch a client's discovery document and JWKS again, keeping the old ones on failure."""
+    async with _metadata_locks[client.name]:
+        # Authlib only fetches the document when _loaded_at is missing
+        loaded_at = client.server_metadata.pop("_loaded_at", None)
+        try:
+            metadata = await client.load_server_metadata()
+            if "jwks_uri" in metadata:
+                await client.fetch_jwk_set(force=True)
+        except Exception:
+            if loaded_at is not None:
+                client.server_metadata.setdefault("_loaded_at", loaded_at)
+            raise
+        _write_cached_metadata(client._server_metadata_url, client.server_metadata)
+        return client.server_metadata
+
+
+async def close_http_transport():
+    """Close the pooled IdP connections; called on application shutdown."""
+    await http_transport.close_pool()
+
+
 def unregister_provider(provider_name: str):
     """Unregister an OIDC provider from OAuth client."""
     try:
@@ -124,6 +285,34 @@ def initialize_oidc_providers():
             logger.error(f"Failed to initialize OIDC providers: {e}")
 
 
+async def warm_provider_metadata(refresh: bool = False):
+    """
+    Fetch discovery metadata and JWKS for all registered providers concurrently,
+    so the first login to each provider does not wait for them. With refresh,
+    metadata that is already loaded is fetched again.
+    """
+    load = refresh_provider_metadata if refresh else load_provider_metadata
+    action = "refresh" if refresh else "prefetch"
+    clients = list(oauth._clients.values())
+    results = await asyncio.gather(
+        *(load(client) for client in clients),
+        return_exceptions=True,
+    )
+    failed = 0
+    for client, result in zip(clients, results):
+        if isinstance(result, Exception):
+            failed += 1
+            logger.warning(f"Could not {action} metadata for OIDC provider {client.name}: {result}")
+    logger.info(f"{action.capitalize()}ed metadata for {len(clients) - failed} of {len(clients)} OIDC providers")
+
+
+async def refresh_provider_metadata_periodically(interval: float = OIDC_METADATA_REFRESH_INTERVAL):
+    """Refetch every registered provider's metadata each interval seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        await warm_provider_metadata(refresh=True)
+
+
 def refresh_provider_registration(provider_id: int):
     """
     Refresh the registration of a specific provider.
@@ -216,56 +405,56 @@ def log_token_information(token: Dict[str, Any], provider_name: str, user_email:
     logger.info(f"Token metadata: {json.dumps(token_metadata, indent=2)}")
 
 
-async def start_oidc_flow(request: Request, provider_id: int, state: str = None):
+async def start_oidc_flow(request: Request, provider: Dict[str, Any], state: str = None):
     """
-    Start the OIDC authentication flow for a specific provider.
+    Start the OIDC authentication flow for a specific provider, given as an
+    entry of get_available_providers().
     Returns the authorization redirect response.
     """
-    with get_db_session() as db:
-        provider = db.query(models.OIDCProvider).filter(models.OIDCProvider.id == provider_id).first()
-        if not provider:
-            raise ValueError(f"OIDC provider with ID {provider_id} not found")
-        
-        provider_name = get_provider_name(provider)
-        redirect_uri = get_redirect_uri(provider_name)
-        
-        client = oauth.create_client(provider_name)
-        if not client:
-            raise ValueError(f"OIDC provider '{provider_name}' not configured")
-        
-        # Generate state token if not provided
-        if not state:
-            state = generate_state_token()
-        
-        # Store state and provider info in session for validation
-        if not hasattr(request, 'session'):
-            raise ValueError("Session middleware not available")
-        
-        # Debug session before storing
-        logger.debug(f"Session before storing - keys: {list(request.session.keys())}, id: {getattr(request.session, 'session_id', 'unknown')}")
-        
-        # Store state information
-        request.session['oidc_state'] = state
-        request.session['oidc_provider_id'] = provider_id
-        request.session['oidc_provider_name'] = provider_name
-        
-        # Force session save to ensure persistence
-        if hasattr(request.session, 'save'):
-            request.session.save()
-        
-        # Debug session after storing
-        logger.debug(f"Session after storing - keys: {list(request.session.keys())}")
-        logger.debug(f"Stored state verification: {request.session.get('oidc_state', 'NOT_FOUND')[:8]}...")
-        
-        logger.info(f"Starting OIDC flow for provider: {provider.display_name} (state: {state[:8]}...)")
-        logger.debug(f"Stored session state: {state}, provider_id: {provider_id}, provider_name: {provider_name}")
-        logger.debug(f"Redirect URI: {redirect_uri}")
-        
-        return await client.authorize_redirect(
-            request, 
-            redirect_uri,
-            state=state
-        )
+    provider_id = provider["id"]
+    provider_name = provider["provider_name"]
+    redirect_uri = get_redirect_uri(provider_name)
+    
+    client = oauth.create_client(provider_name)
+    if not client:
+        raise ValueError(f"OIDC provider '{provider_name}' not configured")
+    
+    # Generate state token if not provided
+    if not state:
+        state = generate_state_token()
+    
+    # Store state and provider info in session for validation
+    if not hasattr(request, 'session'):
+        raise ValueError("Session middleware not available")
+    
+    # Debug session before storing
+    logger.debug(f"Session before storing - keys: {list(request.session.keys())}, id: {getattr(request.session, 'session_id', 'unknown')}")
+    
+    # Store state information
+    request.session['oidc_state'] = state
+    request.session['oidc_provider_id'] = provider_id
+    request.session['oidc_provider_name'] = provider_name
+    
+    # Force session save to ensure persistence
+    if hasattr(request.session, 'save'):
+        request.session.save()
+    
+    # Debug session after storing
+    logger.debug(f"Session after storing - keys: {list(request.session.keys())}")
+    logger.debug(f"Stored state verification: {request.session.get('oidc_state', 'NOT_FOUND')[:8]}...")
+    
+    logger.info(f"Starting OIDC flow for provider: {provider['display_name']} (state: {state[:8]}...)")
+    logger.debug(f"Stored session state: {state}, provider_id: {provider_id}, provider_name: {provider_name}")
+    logger.debug(f"Redirect URI: {redirect_uri}")
+    
+    await load_provider_metadata(client)
+    return await client.authorize_redirect(
+        request, 
+        redirect_uri,
+        state=state
+    )
+    
+    
 
 
 async def process_auth_response(request: Request, provider_name: str, redirect_uri: str, state: str = None):
@@ -311,6 +500,7 @@ async def process_auth_response(request: Request, provider_name: str, redirect_u
         if not client:
             raise ValueError(f"OIDC provider '{provider_name}' not found or configured")
         
+        await load_provider_metadata(client)
         token = await client.authorize_access_token(request)
         
         # Authlib automatically fetches userinfo and attaches it to the token
@@ -406,6 +596,7 @@ def force_refresh_all_providers():
         try:
             # Clear all existing OAuth client registrations
             oauth._clients.clear()
+            invalidate_providers_cache()
             logger.info("Cleared all existing OIDC provider registrations")
             
             # Re-register all providers from database
@@ -423,19 +614,57 @@ def force_refresh_all_providers():
             logger.error(f"Failed to force refresh OIDC providers: {e}")
 
 
-def get_available_providers() -> list[Dict[str, Any]]:
-    """Get list of available OIDC providers for login page."""
-    with get_db_session() as db:
-        try:
-            providers = db.query(models.OIDCProvider).all()
-            return [
-                {
-                    "id": provider.id,
-                    "display_name": provider.display_name,
-                    "provider_name": get_provider_name(provider)
-                }
-                for provider in providers
-            ]
-        except Exception as e:
-            logger.error(f"Failed to get available providers: {e}")
-            return []
+def invalidate_providers_cache():
+    """Drop the cached provider list; call after any provider is created, updated or deleted."""
+    global _providers_cache
+    with _providers_cache_lock:
+        _providers_cache = None
+
+
+def _load_available_providers() -> list[Dict[str, Any]]:
+    with SessionLocal() as db:
+        # Plain rows with just the columns the login page needs: no ORM instances,
+        # so a relationship added to OIDCProvider later cannot lazy-load once per
+        # provider (N+1) on the landing page
+        providers = db.execute(select(
+            models.OIDCProvider.id,
+            models.OIDCProvider.issuer,
+            models.OIDCProvider.display_name,
+        )).all()
+    return [
+        {
+            "id": provider.id,
+            "display_name": provider.display_name,
+            "provider_name": get_provider_name(provider)
+        }
+        for provider in providers
+    ]
+
+
+def get_available_providers(ttl: float = PROVIDERS_CACHE_TTL) -> list[Dict[str, Any]]:
+    """Get list of available OIDC providers for login page, cached for ttl seconds."""
+    global _providers_cache
+    with _providers_cache_lock:
+        cached = _providers_cache
+        if cached is None or time.monotonic() - cached[0] >= ttl:
+            try:
+                cached = (time.monotonic(), _load_available_providers())
+            except Exception as e:
+                logger.error(f"Failed to get available providers: {e}")
+                return []
+            _providers_cache = cached
+    return list(cached[1])
+
+
+async def get_available_providers_async(ttl: float = PROVIDERS_CACHE_TTL) -> list[Dict[str, Any]]:
+    """get_available_providers() for request handlers: a cache miss queries the database in a worker thread."""
+    cached = _providers_cache
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return list(cached[1])
+    return await asyncio.to_thread(get_available_providers, ttl)
+
+
+async def get_available_provider(provider_id: int) -> Optional[Dict[str, Any]]:
+    """Look up a single provider in the cached login page list."""
+    providers = await get_available_providers_async()
+    return next((provider for provider in providers if provider["id"] == provider_id), None)
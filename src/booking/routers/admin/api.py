@@ -277,7 +277,7 @@ async def test_backup_connection(
         )
         
         # Test connection
-        result = backup_service.test_connection()
+        result = await backup_service.test_connection()
         
         return result
             
@@ -345,7 +345,7 @@ async def list_backups(
         )
         
         # List backups
-        result = backup_service.list_backups(limit)
+        result = await backup_service.list_backups(limit)
         
         return result
         
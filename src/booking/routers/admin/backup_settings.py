@@ -113,7 +113,7 @@ async def test_backup_connection(
             sas_token=settings.sas_token
         )
         
-        result = backup_service.test_connection()
+        result = await backup_service.test_connection()
         logger.info(f"Backup connection test performed by user {current_user.email}: {result['success']}")
         return result
         
@@ -192,7 +192,7 @@ async def list_backups(
             sas_token=settings.sas_token
         )
         
-        result = backup_service.list_backups(limit=limit)
+        result = await backup_service.list_backups(limit=limit)
         return result
         
     except Exception as e:
@@ -227,7 +227,7 @@ async def perform_backup(storage_account: str, container_name: str, sas_token: s
             raise FileNotFoundError(f"Database file not found: {db_path}")
         
         # Perform backup
-        result = backup_service.upload_database_backup(db_path)
+        result = await backup_service.upload_database_backup(db_path)
         
         # Update settings with result
         settings.last_backup_time = datetime.now(timezone.utc)
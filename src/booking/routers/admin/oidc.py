@@ -22,9 +22,11 @@ def create_oidc_provider(
 ):
     try:
         db_provider = models.OIDCProvider(**provider.dict())
+        oidc.normalize_display_name(db_provider)
         db.add(db_provider)
         db.commit()
         db.refresh(db_provider)
+        oidc.invalidate_providers_cache()
         
         # Register the new provider with OAuth
         try:
@@ -72,9 +74,11 @@ def update_oidc_provider(
         update_data = provider_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(provider, field, value)
+        oidc.normalize_display_name(provider)
         
         db.commit()
         db.refresh(provider)
+        oidc.invalidate_providers_cache()
         
         # Refresh provider registration with updated configuration
         try:
@@ -107,6 +111,7 @@ def delete_oidc_provider(request: Request, provider_id: int, db: Session = Depen
         # Delete from database
         db.delete(provider)
         db.commit()
+        oidc.invalidate_providers_cache()
         
         # Remove provider registration
         try:
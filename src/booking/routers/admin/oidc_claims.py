@@ -8,7 +8,7 @@ from typing import List, Dict, Any
 import json
 import logging
 
-from ... import models, schemas
+from ... import models, schemas, oidc
 from ...database import get_db
 from ...security import get_current_admin_user
 from ...claims_service import ClaimsMappingService, ClaimsProcessingError
@@ -29,9 +29,11 @@ def create_oidc_provider(
     """Create a new OIDC provider"""
     try:
         db_provider = models.OIDCProvider(**provider.dict())
+        oidc.normalize_display_name(db_provider)
         db.add(db_provider)
         db.commit()
         db.refresh(db_provider)
+        oidc.invalidate_providers_cache()
         
         logger.info(f"Created OIDC provider: {db_provider.issuer}")
         return db_provider
@@ -95,9 +97,11 @@ def update_oidc_provider(
         update_data = provider_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(provider, field, value)
+        oidc.normalize_display_name(provider)
         
         db.commit()
         db.refresh(provider)
+        oidc.invalidate_providers_cache()
         
         logger.info(f"Updated OIDC provider {provider_id}")
         return provider
@@ -123,6 +127,7 @@ def delete_oidc_provider(
         
         db.delete(provider)
         db.commit()
+        oidc.invalidate_providers_cache()
         
         logger.info(f"Deleted OIDC provider {provider_id}")
         return {"ok": True}
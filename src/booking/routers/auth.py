@@ -3,6 +3,7 @@ from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 import logging
+import os
 
 from ..logging_config import get_logger
 from ..database import get_db
@@ -16,6 +17,16 @@ logger = get_logger("routers.auth")
 
 router = APIRouter()
 
+# Deployment settings behind the post-logout HTTPS decision; fixed for the
+# lifetime of the process, so they are read once instead of per request
+FORCE_HTTPS_REDIRECTS = os.getenv("FORCE_HTTPS_REDIRECTS", "").lower() in ("true", "1", "yes")
+# In a container, assume production deployment with HTTPS termination
+# unless explicitly running in development mode
+IN_PRODUCTION_CONTAINER = (
+    bool(os.getenv("DOCKER_CONTAINER") or os.path.exists("/.dockerenv"))
+    and os.getenv("ENVIRONMENT", "").lower() not in ("development", "dev", "local")
+)
+
 
 @router.post("/api/token")
 def login_for_access_token(
@@ -155,8 +166,6 @@ def _get_secure_logout_redirect_uri(request: Request) -> str:
     """
     Generate a secure post-logout redirect URI, ensuring HTTPS in production environments.
     """
-    import os
-    
     # Build base URL from request
     base_url = str(request.base_url).rstrip('/')
     post_logout_redirect_uri = f"{base_url}/logout-complete"
@@ -165,7 +174,7 @@ def _get_secure_logout_redirect_uri(request: Request) -> str:
     force_https = False
     
     # Method 1: Check for explicit environment variable
-    if os.getenv("FORCE_HTTPS_REDIRECTS", "").lower() in ("true", "1", "yes"):
+    if FORCE_HTTPS_REDIRECTS:
         force_https = True
         logger.debug("Force HTTPS enabled via FORCE_HTTPS_REDIRECTS environment variable")
     
@@ -178,13 +187,10 @@ def _get_secure_logout_redirect_uri(request: Request) -> str:
         force_https = True
         logger.debug("HTTPS detected via X-Forwarded-Ssl header")
     
-    # Method 3: Check if running in containerized environment (common production setup)
-    elif os.getenv("DOCKER_CONTAINER") or os.path.exists("/.dockerenv"):
-        # In container, assume production deployment with HTTPS termination
-        # unless explicitly running in development mode
-        if os.getenv("ENVIRONMENT", "").lower() not in ("development", "dev", "local"):
-            force_https = True
-            logger.debug("HTTPS assumed for containerized production deployment")
+    # Method 3: Check if running in containerized production environment
+    elif IN_PRODUCTION_CONTAINER:
+        force_https = True
+        logger.debug("HTTPS assumed for containerized production deployment")
     
     # Apply HTTPS if determined necessary
     if force_https and post_logout_redirect_uri.startswith("http://"):
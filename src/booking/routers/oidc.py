@@ -1,30 +1,30 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi import APIRouter, Request, HTTPException, Query
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
 import logging
 
-from .. import oidc, models, security
-from ..database import get_db
+from .. import oidc, security
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 @router.get("/login/{provider_id}")
-async def oidc_login(request: Request, provider_id: int, db: Session = Depends(get_db)):
+async def oidc_login(request: Request, provider_id: int):
     """
     Redirects the user to the OIDC provider for authentication.
     """
     try:
-        # Verify provider exists
-        provider = db.query(models.OIDCProvider).filter(models.OIDCProvider.id == provider_id).first()
+        # Verify provider exists, using the cached provider list rather than the database
+        provider = await oidc.get_available_provider(provider_id)
         if not provider:
             raise HTTPException(status_code=404, detail="OIDC provider not found")
         
         # Start OIDC flow
-        redirect_response = await oidc.start_oidc_flow(request, provider_id)
+        redirect_response = await oidc.start_oidc_flow(request, provider)
         return redirect_response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"OIDC login error for provider {provider_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to start OIDC authentication")
@@ -74,42 +74,18 @@ async def oidc_callback(
         
         # Create response and set cookies
         response = RedirectResponse(url="/app")
-        response.set_cookie(
-            key="access_token", 
-            value=f"Bearer {access_token}", 
-            httponly=True,
-            secure=request.url.scheme == "https",
-            samesite="lax"
-        )
-        response.set_cookie(
-            key="refresh_token", 
-            value=f"Bearer {refresh_token}", 
-            httponly=True,
-            secure=request.url.scheme == "https",
-            samesite="lax"
-        )
-        if id_token:
-            response.set_cookie(
-                key="id_token", 
-                value=id_token, 
-                httponly=True,
-                secure=request.url.scheme == "https",
-                samesite="lax"
-            )
-        response.set_cookie(
-            key="auth_method", 
-            value="oidc", 
-            httponly=True,
-            secure=request.url.scheme == "https",
-            samesite="lax"
-        )
-        response.set_cookie(
-            key="oidc_provider", 
-            value=provider_name, 
-            httponly=True,
-            secure=request.url.scheme == "https",
-            samesite="lax"
-        )
+        cookies = {
+            "access_token": f"Bearer {access_token}",
+            "refresh_token": f"Bearer {refresh_token}",
+            "id_token": id_token,
+            "auth_method": "oidc",
+            "oidc_provider": provider_name,
+        }
+        cookie_options = {"httponly": True, "secure": request.url.scheme == "https", "samesite": "lax"}
+        for key, value in cookies.items():
+            # The provider may not have issued an id_token
+            if value:
+                response.set_cookie(key=key, value=value, **cookie_options)
         
         logger.info(f"OIDC authentication successful for provider: {provider_name}")
         return response
@@ -185,7 +161,7 @@ async def get_oidc_providers():
     Get list of available OIDC providers for the login page.
     """
     try:
-        providers = oidc.get_available_providers()
+        providers = await oidc.get_available_providers_async()
         return providers  # Return providers directly instead of nested
     except Exception as e:
         logger.error(f"Failed to get OIDC providers: {e}")
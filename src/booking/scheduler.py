@@ -294,7 +294,7 @@ class ReportScheduler:
                 raise FileNotFoundError(f"Database file not found: {db_path}")
             
             # Perform backup
-            result = backup_service.upload_database_backup(db_path)
+            result = await backup_service.upload_database_backup(db_path)
             
             # Update settings with result
             backup_settings.last_backup_time = datetime.now(timezone.utc)
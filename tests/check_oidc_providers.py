@@ -4,12 +4,14 @@
 import sys
 sys.path.append('src')
 
-from booking.database import get_db
+from sqlalchemy import select
+
+from booking.database import SessionLocal
 from booking import models
 
 def main():
-    db = next(get_db())
-    providers = db.query(models.OIDCProvider).all()
+    with SessionLocal() as db:
+        providers = db.scalars(select(models.OIDCProvider)).all()
     
     print(f"Found {len(providers)} OIDC providers:")
     for provider in providers:
@@ -33,7 +33,7 @@ def test_backup_service():
     
     # Test 1: Connection test
     print("1. Testing connection to Azure Blob Storage...")
-    result = backup_service.test_connection()
+    result = asyncio.run(backup_service.test_connection())
     if result['success']:
         print(f"   ✅ Connection successful: {result['message']}")
     else:
@@ -42,7 +42,7 @@ def test_backup_service():
     
     # Test 2: List existing backups
     print("2. Listing existing backups...")
-    result = backup_service.list_backups(limit=5)
+    result = asyncio.run(backup_service.list_backups(limit=5))
     if result['success']:
         print(f"   ✅ Found {result['count']} backups:")
         for backup in result['backups'][:3]:  # Show first 3
@@ -57,7 +57,7 @@ def test_backup_service():
     db_path = "./booking.db"
     if os.path.exists(db_path):
         print("3. Testing database backup...")
-        result = backup_service.upload_database_backup(db_path)
+        result = asyncio.run(backup_service.upload_database_backup(db_path))
         if result['success']:
             print(f"   ✅ Backup successful:")
             print(f"      - Blob Name: {result['blob_name']}")